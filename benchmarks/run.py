@@ -0,0 +1,192 @@
+"""Benchmarks for the calculation, simulation and LP hot paths.
+
+Usage::
+
+    python benchmarks/run.py                       # run and print
+    python benchmarks/run.py --save benchmarks/baseline.json
+    python benchmarks/run.py --compare benchmarks/baseline.json --threshold 0.25
+
+Each case records the best wall time over `--repeat` runs and the peak
+traced memory of one extra run (tracemalloc, which also sees NumPy buffers).
+`--compare` flags cases that got slower or bigger than the baseline by more
+than `--threshold` and exits non-zero when any did. `--quick` restricts the
+sizes to the small end so the suite finishes in seconds.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory.calculations import compute_inventory_policy  # noqa: E402
+from inventory.network import build_network_lp, solve_network_lp  # noqa: E402
+from inventory.simulation import simulate_customers, simulate_sq  # noqa: E402
+
+SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+QUICK_SIZES = [10 ** 2, 10 ** 3]
+DAYS = [30, 365]
+
+# Differences below these floors are timer / allocator noise, not regressions
+NOISE_FLOOR = {'seconds': 0.005, 'peak_mb': 1.0}
+
+
+def make_catalog(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Avg. Demand': rng.uniform(5, 100, n),
+        'St. Dev. Demand': rng.uniform(1, 10, n),
+        'Avg. Lead Time': rng.integers(1, 8, n).astype(float),
+        'St. Dev. Lead Time': rng.uniform(0, 2, n),
+        'Service Level': rng.uniform(90, 99.5, n),
+        'Order Cost': rng.uniform(5, 50, n),
+        'Holding $/Unit': rng.uniform(1, 5, n),
+    })
+
+
+def make_network(retailers, seed=0):
+    """Supplier -> distributors -> retailers tree with one distributor per 25 retailers."""
+    rng = np.random.default_rng(seed)
+    distributors = max(1, retailers // 25)
+    retailer_names = [f"R{i}" for i in range(retailers)]
+    distributor_names = [f"D{i}" for i in range(distributors)]
+    nodes = pd.DataFrame({'Node': ['S1'] + distributor_names + retailer_names})
+    nodes['Demand'] = np.r_[np.zeros(1 + distributors), rng.uniform(10, 100, retailers)]
+    edges = pd.DataFrame({
+        'Source': ['S1'] * distributors + [distributor_names[i % distributors] for i in range(retailers)],
+        'Target': distributor_names + retailer_names,
+        'Cost': rng.uniform(1, 5, distributors + retailers),
+    })
+    return nodes, edges
+
+
+def case_policy(n):
+    catalog = make_catalog(n)
+    return lambda: compute_inventory_policy(catalog)
+
+
+def case_seio(n, days):
+    catalog = make_catalog(n)
+    policy = compute_inventory_policy(catalog)
+    args = (catalog['Avg. Demand'].to_numpy(), catalog['St. Dev. Demand'].to_numpy(),
+            catalog['Avg. Lead Time'].to_numpy(), catalog['St. Dev. Lead Time'].to_numpy(),
+            policy['Reorder Point'].to_numpy(), policy['EOQ'].to_numpy())
+    return lambda: simulate_sq(*args, days, replications=1, seed=0)
+
+
+def case_meio(n, days):
+    catalog = make_catalog(n)
+    policy = compute_inventory_policy(catalog)
+    args = (catalog['Avg. Demand'].to_numpy(), catalog['St. Dev. Demand'].to_numpy(),
+            policy['Reorder Point'].to_numpy(), policy['EOQ'].to_numpy(),
+            catalog['Avg. Lead Time'].to_numpy(), catalog['St. Dev. Lead Time'].to_numpy())
+    return lambda: simulate_customers(*args, days, seed=0)
+
+
+def case_lp(n):
+    nodes, edges = make_network(n)
+    return lambda: solve_network_lp(build_network_lp(nodes, edges))
+
+
+def benchmark_cases(sizes, max_sim_cells, max_lp_size):
+    """Yield (name, params, factory) for every benchmark case."""
+    for n in sizes:
+        yield 'policy', {'n': n}, lambda n=n: case_policy(n)
+    for n in sizes:
+        for days in DAYS:
+            if n * days <= max_sim_cells:
+                yield 'seio_simulation', {'n': n, 'days': days}, lambda n=n, days=days: case_seio(n, days)
+                yield 'meio_simulation', {'n': n, 'days': days}, lambda n=n, days=days: case_meio(n, days)
+    for n in sizes:
+        if n <= max_lp_size:
+            yield 'network_lp', {'n': n}, lambda n=n: case_lp(n)
+
+
+def case_key(name, params):
+    return name + '[' + ','.join(f"{k}={v}" for k, v in params.items()) + ']'
+
+
+def measure(func, repeat):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(times), 'peak_mb': peak / 2 ** 20}
+
+
+def compare(results, baseline, threshold):
+    """Return a list of human-readable regressions against `baseline`."""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            old, new = baseline[key][metric], result[metric]
+            if new - old > NOISE_FLOOR[metric] and new > old * (1 + threshold):
+                regressions.append(f"{key} {metric}: {old:.4g} -> {new:.4g} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="only run the smallest sizes")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument('--max-sim-cells', type=float, default=4e7, help="largest n x days simulated")
+    parser.add_argument('--max-lp-size', type=int, default=10 ** 5, help="largest retailer count solved")
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this text")
+    parser.add_argument('--save', help="write results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed relative slowdown / growth")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    results = {}
+    for name, params, factory in benchmark_cases(sizes, args.max_sim_cells, args.max_lp_size):
+        if args.filter not in name:
+            continue
+        key = case_key(name, params)
+        results[key] = measure(factory(), args.repeat)
+        print(f"{key:<40} {results[key]['seconds'] * 1000:>10.1f} ms {results[key]['peak_mb']:>9.1f} MB", flush=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'pandas': pd.__version__,
+                    'machine': platform.machine(),
+                    'cpus': os.cpu_count(),
+                },
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+"""Shared inventory calculations used by the Streamlit pages and batch jobs."""
+
+from inventory.calculations import (
+    calculate_eoq,
+    calculate_reorder_point,
+    calculate_safety_stock,
+    compute_inventory_policy,
+)
@@ -0,0 +1,50 @@
+"""Deferred module imports.
+
+`lazy_import('scipy.stats')` returns a stand-in that imports the real module
+on first attribute access, so importing the calculation core costs little
+more than NumPy. How long each deferred import took is recorded for
+`import_report`.
+"""
+
+import importlib
+import threading
+import time
+
+_load_times = {}
+_lock = threading.Lock()
+
+
+class LazyModule:
+    """Module proxy that imports `name` the first time one of its attributes is used."""
+
+    def __init__(self, name, before_load=None):
+        self.__dict__['_name'] = name
+        self.__dict__['_before_load'] = before_load
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        with _lock:
+            if self._module is None:
+                start = time.perf_counter()
+                if self._before_load is not None:
+                    self._before_load()
+                self.__dict__['_module'] = importlib.import_module(self._name)
+                _load_times.setdefault(self._name, time.perf_counter() - start)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._module or self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name, before_load=None):
+    """Return a `LazyModule` for `name`; `before_load` runs just before the real import."""
+    return LazyModule(name, before_load)
+
+
+def import_report():
+    """Seconds spent on each deferred import triggered so far in this process."""
+    return dict(_load_times)
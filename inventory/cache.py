@@ -0,0 +1,178 @@
+"""Bounded, parameter-keyed result cache for the Streamlit pages.
+
+Streamlit reruns a page top to bottom on every widget change. The cached
+entry points at the bottom of this module live in an imported module, so they
+survive reruns and are shared by every session in the server process. Keys
+are built from the normalized call arguments: `5` and `5.0` hit the same
+entry, and arrays, DataFrames and in-memory files (uploads) are keyed by
+content. Stochastic functions
+are only cached when called with an explicit `seed`. Caches of array-heavy
+results are bounded by the bytes of their arrays as well as their entry
+count.
+
+Cached results are shared between callers and must be treated as read-only,
+except the `network_solver` sessions, which are meant to be re-solved in place.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import inspect
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from inventory import calculations, costs, events, forecast, ingest, network, saa, simulation
+
+
+class ResultCache:
+    """Thread-safe LRU mapping with hit/miss counters.
+
+    With `maxbytes`, the least recently used entries are also evicted while
+    the array bytes of all entries (`result_nbytes`) exceed it, and a result
+    larger than `maxbytes` on its own is returned without being stored.
+    """
+
+    def __init__(self, maxsize=128, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._data = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+
+        value = compute()  # computed outside the lock so other sessions are not blocked
+        nbytes = result_nbytes(value) if self.maxbytes is not None else 0
+        if self.maxbytes is not None and nbytes > self.maxbytes:
+            return value
+
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._data[key][1]
+            self._data[key] = (value, nbytes)
+            self._data.move_to_end(key)
+            self.nbytes += nbytes
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self.nbytes > self.maxbytes):
+                self.nbytes -= self._data.popitem(last=False)[1][1]
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize,
+                    'bytes': self.nbytes, 'maxbytes': self.maxbytes}
+
+    def __len__(self):
+        return len(self._data)
+
+
+def normalize(value):
+    """Turn an argument into a hashable, canonical cache key component."""
+    if value is None or isinstance(value, (bool, str, np.bool_)):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)  # exact; equal ints and floats still compare and hash alike
+    if isinstance(value, (float, np.floating)):
+        return float(f"{float(value):.12g}")  # absorb float noise from number widgets
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return ('ndarray', data.shape, data.dtype.str, hashlib.sha1(data.tobytes()).hexdigest())
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        row_hashes = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        names = tuple(value.columns) if isinstance(value, pd.DataFrame) else (value.name,)
+        return (type(value).__name__, names, hashlib.sha1(row_hashes.tobytes()).hexdigest())
+    if isinstance(value, io.BytesIO):  # e.g. a Streamlit upload; the name tells CSV from Parquet
+        return ('file', getattr(value, 'name', None), hashlib.sha1(value.getbuffer()).hexdigest())
+    if isinstance(value, np.random.SeedSequence):
+        return ('SeedSequence', value.entropy, value.spawn_key, value.pool_size)
+    if isinstance(value, dict):
+        return tuple(sorted((normalize(k), normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(v) for v in value)
+    return value
+
+
+def result_nbytes(value):
+    """Bytes held by the arrays and pandas objects in a (nested) result.
+
+    Memory-mapped arrays live in their file and count as nothing.
+    """
+    if isinstance(value, np.memmap):
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(index=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, dict):
+        return sum(result_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(result_nbytes(v) for v in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sum(result_nbytes(getattr(value, field.name)) for field in dataclasses.fields(value))
+    return 0
+
+
+def cached(maxsize=128, seed_arg=None, maxbytes=None):
+    """Decorator caching `func` by its normalized arguments in a `ResultCache`.
+
+    When `seed_arg` names an argument, calls where it is None are random and
+    bypass the cache. The cache is exposed as `wrapper.cache`.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache = ResultCache(maxsize, maxbytes)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if seed_arg is not None and bound.arguments[seed_arg] is None:
+                return func(*args, **kwargs)
+            key = tuple((name, normalize(value)) for name, value in bound.arguments.items())
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Hit/miss counters of every cached entry point, keyed by function name."""
+    return {func.__name__: func.cache.stats() for func in CACHED_FUNCTIONS}
+
+
+# Cached entry points used by the Streamlit pages
+
+SIMULATION_BYTES = 256 * 2**20  # array budget of each simulation cache
+
+safety_stock = cached(maxsize=1024)(calculations.calculate_safety_stock)
+inventory_policy = cached(maxsize=64)(calculations.compute_inventory_policy)
+eoq_cost_curve = cached(maxsize=64)(calculations.eoq_cost_curve)
+cost_sweep = cached(maxsize=64)(costs.sweep_service_level_and_quantity)
+simulate_sq = cached(maxsize=64, seed_arg='seed', maxbytes=SIMULATION_BYTES)(simulation.simulate_sq)
+simulate_customers = cached(maxsize=32, seed_arg='seed', maxbytes=SIMULATION_BYTES)(simulation.simulate_customers)
+network_solver = cached(maxsize=8)(network.network_solver)  # solver sessions, mutated by their solves
+simulate_network_events = cached(maxsize=16, seed_arg='seed', maxbytes=SIMULATION_BYTES)(events.simulate_network_events)
+optimize_network_saa = cached(maxsize=16, seed_arg='seed')(saa.optimize_network_saa)
+forecast_demand = cached(maxsize=32)(forecast.fit_holt_winters)
+demand_statistics = cached(maxsize=8)(ingest.demand_statistics)
+
+CACHED_FUNCTIONS = [safety_stock, inventory_policy, eoq_cost_curve, cost_sweep, simulate_sq, simulate_customers, network_solver,
+                    simulate_network_events, optimize_network_saa, forecast_demand, demand_statistics]
@@ -0,0 +1,89 @@
+"""Safety stock, reorder point and EOQ formulas.
+
+Every function accepts scalars, NumPy arrays or pandas Series and broadcasts
+element-wise, so a whole catalog is computed in one pass instead of one
+`DataFrame.apply` call per row.
+"""
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.profiling import instrument
+
+pd = lazy_import('pandas')
+stats = lazy_import('scipy.stats')
+
+DAYS_PER_YEAR = 365
+
+# Column names used by the MEIO tables, shared with the catalog helpers below
+DEMAND_MEAN = 'Avg. Demand'
+DEMAND_STD = 'St. Dev. Demand'
+LEAD_TIME = 'Avg. Lead Time'
+LEAD_TIME_STD = 'St. Dev. Lead Time'
+SERVICE_LEVEL = 'Service Level'
+ORDER_COST = 'Order Cost'
+HOLDING_COST = 'Holding $/Unit'
+
+
+# Convert service level percentage to Z-score
+@instrument
+def service_level_to_z(service_level):
+    return stats.norm.ppf(np.asarray(service_level, dtype=float) / 100)
+
+
+# Function to calculate safety stock incorporating lead time variability
+def calculate_safety_stock(demand_std, lead_time, lead_time_std, service_level):
+    z = service_level_to_z(service_level)
+    demand_var = np.square(demand_std)
+    return z * np.sqrt((demand_var * lead_time) + (demand_var * np.square(lead_time_std)))
+
+
+# Function to calculate reorder point
+def calculate_reorder_point(demand_mean, lead_time, safety_stock):
+    return (demand_mean * lead_time) + safety_stock
+
+
+# Function to calculate EOQ from daily demand and annual holding cost
+def calculate_eoq(demand_mean, order_cost, holding_cost):
+    return np.sqrt((2 * np.multiply(demand_mean, DAYS_PER_YEAR) * order_cost) / holding_cost)
+
+
+def eoq_cost_curve(demand_mean, order_cost, holding_cost, points=5000):
+    """Annual holding, ordering and total cost over order quantities 5 .. 1.5 x EOQ."""
+    quantity = np.linspace(5, calculate_eoq(demand_mean, order_cost, holding_cost) * 1.5, points)
+    holding = (holding_cost * quantity) / 2
+    ordering = (order_cost * demand_mean * DAYS_PER_YEAR) / quantity
+    return quantity, holding, ordering, holding + ordering
+
+
+@instrument
+def compute_inventory_policy(df, truncate=False):
+    """Return Safety Stock, Reorder Point and EOQ columns for every row of `df`.
+
+    `df` uses the MEIO table column names (`Avg. Demand`, `St. Dev. Demand`,
+    `Avg. Lead Time`, `St. Dev. Lead Time`, `Service Level`, and optionally
+    `Order Cost` and `Holding $/Unit` for EOQ). With `truncate=True` the values
+    are cast to int the same way the pages display them.
+    """
+    demand_mean = df[DEMAND_MEAN].to_numpy(dtype=float)
+    lead_time = df[LEAD_TIME].to_numpy(dtype=float)
+
+    safety_stock = calculate_safety_stock(
+        df[DEMAND_STD].to_numpy(dtype=float),
+        lead_time,
+        df[LEAD_TIME_STD].to_numpy(dtype=float),
+        df[SERVICE_LEVEL].to_numpy(dtype=float))
+    if truncate:
+        safety_stock = np.trunc(safety_stock)
+    reorder_point = calculate_reorder_point(demand_mean, lead_time, safety_stock)
+
+    result = pd.DataFrame({'Safety Stock': safety_stock, 'Reorder Point': reorder_point}, index=df.index)
+    if ORDER_COST in df and HOLDING_COST in df:
+        result['EOQ'] = calculate_eoq(
+            demand_mean,
+            df[ORDER_COST].to_numpy(dtype=float),
+            df[HOLDING_COST].to_numpy(dtype=float))
+
+    if truncate:
+        result = result.apply(np.trunc).astype(int)
+    return result
@@ -0,0 +1,270 @@
+"""Reusable page figures with a bounded drawing cost.
+
+`st.pyplot` rasterizes a freshly built figure at 200 dpi on every rerun, and
+the cost grows with every point and line plotted. A `Chart` instead keeps a
+matplotlib `Figure` per session (`page_chart`), updates its artists in place
+on each rerun and only rasterizes again when something plotted changed;
+otherwise `show_chart` resends the PNG of the previous rerun. A session keeps
+its `SESSION_CHARTS` most recently used charts, so the figures of a page left
+behind are freed once another page draws its own.
+
+The cost of a redraw does not grow with the horizon or the network size:
+
+- a series longer than `LINE_POINTS` is drawn as its min/max envelope over
+  at most `ENVELOPE_POINTS` buckets (`trajectories.minmax_decimate`), since a
+  filled polygon rasterizes far faster than a dense zig-zag line. The
+  envelope keeps the line's color, alpha and label, outlines itself with the
+  line's width and style when given, and drops markers;
+- more than `MAX_LINES` series on one axes are drawn as percentile bands
+  across the series around their median.
+
+Usage in a page::
+
+    chart = page_chart("SEIO", [['demand', 'lead_time'], ['inventory', 'inventory']], figsize=(12, 8))
+    chart.line('inventory', 'level', days, levels, label="Inventory Level")
+    chart.axes['inventory'].set_title("Inventory Over Time")
+    show_chart(chart)
+
+Artists that are not updated during a rerun are removed when it is shown.
+"""
+
+import hashlib
+import io
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.profiling import span
+from inventory.trajectories import iter_blocks, minmax_decimate
+
+st = lazy_import('streamlit')
+figure = lazy_import('matplotlib.figure')
+backend_agg = lazy_import('matplotlib.backends.backend_agg')
+image = lazy_import('PIL.Image')
+
+DPI = 100
+LINE_POINTS = 600       # longer series are drawn as min/max envelopes
+ENVELOPE_POINTS = 1000  # rows kept by the envelope decimation (two per bucket)
+MAX_LINES = 10          # more series per axes are drawn as percentile bands
+SESSION_CHARTS = 2      # charts kept per session, the most any page draws
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class Chart:
+    """A figure whose artists are created once and updated on later reruns."""
+
+    def __init__(self, mosaic, figsize, dpi=DPI, **gridspec_kw):
+        self.figure = figure.Figure(figsize=figsize, dpi=dpi, layout='constrained')
+        backend_agg.FigureCanvasAgg(self.figure)
+        self.axes = self.figure.subplot_mosaic(mosaic, gridspec_kw=gridspec_kw or None)
+        self._artists = {}     # (axes name, key) -> (kind, artist)
+        self._aggregates = {}  # (axes name, key) -> (weak reference to values, percentile rows across the series)
+        self._png = None
+        self._fingerprint = None
+        self._layout = None
+        self.begin()
+
+    def begin(self):
+        """Start a rerun: artists not updated from here on are dropped by `render`."""
+        self._touched = set()
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    def line(self, ax, key, x, y, **style):
+        """Plot `y` against `x` (or the day index when None), as an envelope when long."""
+        y = np.asarray(y, dtype=float)
+        x = np.arange(len(y)) if x is None else np.asarray(x, dtype=float)
+        if len(y) > LINE_POINTS:
+            x, low, high = _envelope(x, y, y)
+            return self.band(ax, key, x, low, high, **_envelope_style(style))
+        artist = self._reuse(ax, key, 'line')
+        if artist is None:
+            artist, = self.axes[ax].plot(x, y, **style)
+            self._artists[ax, key] = ('line', artist)
+        else:
+            artist.set_data(x, y)
+            artist.set(**style)
+        self._record(ax, key, 'line', style, x, y)
+        return artist
+
+    def hline(self, ax, key, y, **style):
+        """Horizontal reference line at `y` across the axes."""
+        artist = self._reuse(ax, key, 'hline')
+        if artist is None:
+            artist = self.axes[ax].axhline(y, **style)
+            self._artists[ax, key] = ('hline', artist)
+        else:
+            artist.set_ydata([y, y])
+            artist.set(**style)
+        self._record(ax, key, 'hline', style, [y])
+        return artist
+
+    def vline(self, ax, key, x, **style):
+        """Vertical reference line at `x` across the axes."""
+        artist = self._reuse(ax, key, 'vline')
+        if artist is None:
+            artist = self.axes[ax].axvline(x, **style)
+            self._artists[ax, key] = ('vline', artist)
+        else:
+            artist.set_xdata([x, x])
+            artist.set(**style)
+        self._record(ax, key, 'vline', style, [x])
+        return artist
+
+    def band(self, ax, key, x, low, high, **style):
+        """Filled area between `low` and `high`."""
+        x, low, high = (np.asarray(v, dtype=float) for v in (x, low, high))
+        artist = self._reuse(ax, key, 'band')
+        if artist is not None:
+            artist.remove()
+        artist = self.axes[ax].fill_between(x, low, high, **{'linewidth': 0, **style})
+        artist.sticky_edges.y[:] = []
+        self._artists[ax, key] = ('band', artist)
+        self._touched.add((ax, key))
+        self._record(ax, key, 'band', style, x, low, high)
+        return artist
+
+    def barh(self, ax, key, labels, values, **style):
+        """Horizontal bars, resized in place while the labels stay the same."""
+        labels, values = list(labels), np.asarray(values, dtype=float)
+        bars = self._reuse(ax, key, 'barh')
+        if bars is not None and getattr(bars, '_chart_labels', None) == labels:
+            for bar, value in zip(bars, values):
+                bar.set_width(value)
+            bars.datavalues = values
+        else:
+            if bars is not None:
+                bars.remove()
+            bars = self.axes[ax].barh(labels, values, **style)
+            bars._chart_labels = labels
+            self._artists[ax, key] = ('barh', bars)
+        self._record(ax, key, 'barh', style, values, labels)
+        return bars
+
+    def series(self, ax, key, x, values, labels, max_lines=MAX_LINES, **style):
+        """Plot the columns of a day-major `values` array, one line each up to `max_lines`.
+
+        With more columns the chart shows the 5-95% and 25-75% bands across
+        the columns per day and their median. The percentiles are computed in
+        chunks (memory-mapped input is fine) and reused while the same array
+        object is passed on later reruns.
+        """
+        count = values.shape[1]
+        if count <= max_lines:
+            for column, label in enumerate(labels):
+                self.line(ax, (key, label), x, values[:, column], label=label, **style)
+            return
+        cached = self._aggregates.get((ax, key))
+        if cached is None or cached[0]() is not values:
+            rows = np.concatenate([np.percentile(block, PERCENTILES, axis=1).T for _, block in iter_blocks(values)])
+            cached = self._aggregates[ax, key] = (weakref.ref(values), rows)
+        p5, p25, p50, p75, p95 = cached[1].T
+        x = np.arange(len(p50)) if x is None else np.asarray(x, dtype=float)
+        color = style.get('color', 'tab:blue')
+        self.band(ax, (key, 'outer'), *_envelope(x, p5, p95), color=color, alpha=0.2,
+                  label=f"5-95% of {count:,} series")
+        self.band(ax, (key, 'inner'), *_envelope(x, p25, p75), color=color, alpha=0.4, label="25-75%")
+        self.line(ax, (key, 'median'), x, p50, color=color, label="Median")
+
+    def render(self):
+        """PNG of the chart, rasterized only when its content changed since the last call."""
+        for ax, key in [item for item in self._artists if item not in self._touched]:
+            self._artists.pop((ax, key))[1].remove()
+        for name, ax in self.axes.items():
+            self._hash.update(repr((name, ax.get_title(), ax.get_xlabel(), ax.get_ylabel())).encode())
+        fingerprint = self._hash.digest()
+        if fingerprint == self._fingerprint:
+            return self._png
+
+        with span('rasterize'):
+            for name, ax in self.axes.items():
+                ax.relim()
+                for (band_ax, _), (kind, artist) in self._artists.items():
+                    if kind == 'band' and band_ax == name:
+                        ax.update_datalim(artist.get_datalim(ax.transData))
+                ax.autoscale_view()
+                if ax.get_legend_handles_labels()[1]:
+                    ax.legend()
+                elif ax.get_legend() is not None:
+                    ax.get_legend().remove()
+            # The constrained layout doubles the draw time, so it only runs when
+            # the text around the axes changed size; otherwise positions are kept
+            layout = self._layout_key()
+            self.figure.set_layout_engine('constrained' if layout != self._layout else 'none')
+            canvas = self.figure.canvas
+            canvas.draw()  # savefig would draw twice once a layout engine was set
+            out = io.BytesIO()
+            image.frombuffer('RGBA', canvas.get_width_height(), canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1).save(
+                out, format='png', compress_level=1)
+            self._layout = layout
+        self._png, self._fingerprint = out.getvalue(), fingerprint
+        return self._png
+
+    def _layout_key(self):
+        """Titles, axis labels and the longest tick label of every axis."""
+        key = []
+        for ax in self.axes.values():
+            ticks = [max(map(len, axis.major.formatter.format_ticks(axis.get_majorticklocs())), default=0)
+                     for axis in (ax.xaxis, ax.yaxis)]
+            key.append((ax.get_title(), ax.get_xlabel(), ax.get_ylabel(), *ticks))
+        return key
+
+    def _reuse(self, ax, key, kind):
+        self._touched.add((ax, key))
+        entry = self._artists.get((ax, key))
+        if entry is None:
+            return None
+        if entry[0] != kind:
+            self._artists.pop((ax, key))[1].remove()
+            return None
+        return entry[1]
+
+    def _record(self, ax, key, kind, style, *data):
+        self._hash.update(repr((ax, key, kind, sorted(style.items()))).encode())
+        for values in data:
+            values = np.asarray(values)
+            if values.dtype == object or values.dtype.kind in 'US':
+                self._hash.update(repr(values.tolist()).encode())
+            else:
+                self._hash.update(np.ascontiguousarray(values, dtype=float).tobytes())
+
+
+def page_chart(key, mosaic, figsize, **gridspec_kw):
+    """The chart `key` of this session, created on first use and reset for the new rerun.
+
+    Only the `SESSION_CHARTS` most recently used charts of a session are
+    kept; older ones are dropped with their figures.
+    """
+    charts = st.session_state.setdefault('charts', OrderedDict())
+    chart = charts.get(key)
+    if chart is None:
+        chart = charts[key] = Chart(mosaic, figsize, **gridspec_kw)
+    else:
+        chart.begin()
+    charts.move_to_end(key)
+    while len(charts) > SESSION_CHARTS:
+        charts.popitem(last=False)
+    return chart
+
+
+def show_chart(chart):
+    st.image(chart.render(), width='stretch')
+
+
+def _envelope_style(style):
+    """Band style for the envelope of a line drawn with `style`."""
+    band = {'color': style.get('color'), 'label': style.get('label'), 'alpha': style.get('alpha', 0.6)}
+    linewidth = style.get('linewidth', style.get('lw'))
+    linestyle = style.get('linestyle', style.get('ls'))
+    if linewidth is not None or linestyle is not None:
+        band.update(linewidth=1.5 if linewidth is None else linewidth, linestyle=linestyle or 'solid')
+    return band
+
+
+def _envelope(x, low, high):
+    """`(x, low, high)` reduced to per-bucket min of `low` and max of `high` for long series."""
+    if len(x) <= LINE_POINTS:
+        return x, np.asarray(low, dtype=float), np.asarray(high, dtype=float)
+    days, rows = minmax_decimate(np.column_stack([low, high]), ENVELOPE_POINTS)
+    return np.interp(days[0::2], np.arange(len(x)), x), rows[0::2, 0], rows[1::2, 1]
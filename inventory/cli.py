@@ -0,0 +1,156 @@
+"""Headless batch mode: compute inventory policies for a whole SKU catalog.
+
+Usage::
+
+    python -m inventory catalog.csv -o policies.csv --workers 8
+
+The input table uses the MEIO column names (`Avg. Demand`, `St. Dev. Demand`,
+`Avg. Lead Time`, `St. Dev. Lead Time`, `Service Level`, and `Order Cost` /
+`Holding $/Unit` for EOQ); any other columns are passed through. The catalog
+is split into fixed-size partitions that are processed on a process pool.
+Every SKU draws from its own child seed of `--seed`, chosen by its row number,
+so its sample paths do not depend on the worker count or partition size.
+
+With `--history`, demand mean and std are replaced by exponential-smoothing
+forecasts fitted to a daily demand history file with `Date` and `Quantity`
+columns (see `inventory.forecast`), matched to catalog rows on the
+`--history-keys` columns.
+
+Nothing here imports streamlit or matplotlib.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.calculations import DEMAND_MEAN, DEMAND_STD, LEAD_TIME, LEAD_TIME_STD, compute_inventory_policy
+from inventory.forecast import forecast_statistics
+from inventory.ingest import demand_matrix
+from inventory.simulation import simulate_sq
+from inventory.streams import item_seeds
+
+pd = lazy_import('pandas')
+
+ORDER_QUANTITY = 'Order Quantity'
+SIMULATED_COLUMNS = {
+    'average_inventory': 'Sim. Avg. Inventory',
+    'stockout_units': 'Sim. Stock-Out Units',
+    'order_count': 'Sim. Orders',
+    'fill_rate': 'Sim. Fill Rate',
+}
+
+
+def read_table(path):
+    if path.endswith(('.parquet', '.pq')):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def write_table(df, path):
+    if path.endswith(('.parquet', '.pq')):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def process_partition(partition, days, replications, seed):
+    """Compute policy columns and simulated KPI means for one catalog partition.
+
+    `seed` is the root seed or the partition's `streams.item_seeds`.
+    """
+    policy = compute_inventory_policy(partition)
+    result = partition.join(policy)
+    if days <= 0:
+        return result
+
+    if ORDER_QUANTITY in partition:
+        order_quantity = partition[ORDER_QUANTITY].to_numpy(dtype=float)
+    elif 'EOQ' in policy:
+        order_quantity = policy['EOQ'].to_numpy()
+    else:
+        raise ValueError(f"Simulation needs an '{ORDER_QUANTITY}' column or the EOQ cost columns")
+
+    simulation = simulate_sq(
+        partition[DEMAND_MEAN].to_numpy(dtype=float),
+        partition[DEMAND_STD].to_numpy(dtype=float),
+        partition[LEAD_TIME].to_numpy(dtype=float),
+        partition[LEAD_TIME_STD].to_numpy(dtype=float),
+        policy['Reorder Point'].to_numpy(),
+        order_quantity,
+        days, replications=replications, seed=seed)
+    for attr, column in SIMULATED_COLUMNS.items():
+        result[column] = getattr(simulation, attr).mean(axis=0)
+    return result
+
+
+def _process_partition(args):
+    return process_partition(*args)
+
+
+def run_batch(catalog, days=365, replications=100, seed=0, partition_size=2000, workers=None):
+    """Process `catalog` partition by partition, in parallel when `workers` != 1."""
+    starts = range(0, len(catalog), partition_size)
+    root = np.random.SeedSequence(seed)
+    tasks = [(catalog.iloc[start:start + partition_size], days, replications,
+              item_seeds(root, min(partition_size, len(catalog) - start), start=start))
+             for start in starts]
+
+    if workers == 1 or len(tasks) <= 1:
+        results = map(_process_partition, tasks)
+        return pd.concat(list(results)) if tasks else catalog.copy()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return pd.concat(list(executor.map(_process_partition, tasks)))
+
+
+def apply_forecast(catalog, history_path, keys, season_length=1):
+    """Overwrite the catalog's demand mean/std with forecasts where the history has the key.
+
+    A catalog without demand columns takes them from the forecast, so every
+    row must then have history.
+    """
+    forecast = forecast_statistics(demand_matrix(history_path, keys=keys), season_length=season_length)
+    # Suffix explicitly: join only suffixes names that clash, and the catalog may lack the demand columns
+    forecast = forecast.rename(columns=lambda column: column + ' (forecast)')
+    matched = catalog.join(forecast, on=keys)
+    for column in (DEMAND_MEAN, DEMAND_STD):
+        if column in catalog:
+            catalog[column] = matched[column + ' (forecast)'].fillna(catalog[column])
+            continue
+        missing = matched[column + ' (forecast)'].isna()
+        if missing.any():
+            raise ValueError(f"Catalog has no '{column}' column and {missing.sum()} rows have no demand history")
+        catalog[column] = matched[column + ' (forecast)']
+    return catalog
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m inventory', description=__doc__.splitlines()[0])
+    parser.add_argument('catalog', help="SKU table (CSV or Parquet)")
+    parser.add_argument('-o', '--output', required=True, help="output file (CSV or Parquet)")
+    parser.add_argument('--days', type=int, default=365, help="simulated days per SKU, 0 to skip simulation")
+    parser.add_argument('--replications', type=int, default=100, help="simulation replications per SKU")
+    parser.add_argument('--seed', type=int, default=0, help="root random seed")
+    parser.add_argument('--partition-size', type=int, default=2000, help="SKUs per worker task")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--history', help="daily demand history (CSV or Parquet) to forecast demand from")
+    parser.add_argument('--history-keys', default='SKU', help="comma-separated columns matching history to catalog rows")
+    parser.add_argument('--season-length', type=int, default=1, help="seasonal period of the history in days (1: none)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    catalog = read_table(args.catalog)
+    if args.history:
+        catalog = apply_forecast(catalog, args.history, args.history_keys.split(','), args.season_length)
+    result = run_batch(catalog, days=args.days, replications=args.replications, seed=args.seed,
+                       partition_size=args.partition_size, workers=args.workers)
+    write_table(result, args.output)
+    print(f"Wrote {len(result)} rows to {args.output} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
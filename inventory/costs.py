@@ -0,0 +1,92 @@
+"""Annual inventory cost model and the service level / order quantity sweep."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from inventory.calculations import DAYS_PER_YEAR, calculate_eoq, calculate_safety_stock
+from inventory.profiling import instrument
+
+# Annual holding and ordering cost of cycling order quantity `quantity`
+def annual_cycle_costs(quantity, holding_cost_per_unit, order_cost, demand_mean):
+    holding_cost_ann = (holding_cost_per_unit * quantity) / 2
+    ordering_cost_ann = (order_cost * demand_mean * DAYS_PER_YEAR) / quantity
+    return holding_cost_ann, ordering_cost_ann
+
+
+# Annual cost of the demand left unserved at `service_level` percent
+def annual_stock_out_cost(demand_mean, stock_out_cost_per_unit, service_level):
+    return stock_out_cost_per_unit * ((100 - service_level) / 100) * DAYS_PER_YEAR * demand_mean
+
+
+# Function to calculate annual inventory and stock-out costs
+def calc_inv_cost(quantity, holding_cost_per_unit, order_cost, demand_mean, stock_out_cost_per_unit, service_level):
+    holding_cost_ann, ordering_cost_ann = annual_cycle_costs(quantity, holding_cost_per_unit, order_cost, demand_mean)
+    inventory_cost_ann = holding_cost_ann + ordering_cost_ann
+    stock_out_cost_ann = annual_stock_out_cost(demand_mean, stock_out_cost_per_unit, service_level)
+    return inventory_cost_ann, stock_out_cost_ann, holding_cost_ann, ordering_cost_ann
+
+
+@dataclass
+class CostSweep:
+    """Result of `sweep_service_level_and_quantity` for n SKUs over m service levels."""
+
+    service_levels: np.ndarray        # (m,)
+    frontier_cost: np.ndarray         # (n, m) lowest total cost at each service level
+    frontier_quantity: np.ndarray     # (n, m) order quantity achieving it
+    best_service_level: np.ndarray    # (n,)
+    best_order_quantity: np.ndarray   # (n,)
+    best_cost: np.ndarray             # (n,)
+
+
+@instrument
+def sweep_service_level_and_quantity(demand_mean, demand_std, lead_time, lead_time_std, holding_cost_per_unit,
+                                     order_cost, stock_out_cost_per_unit, service_levels=None,
+                                     order_quantities=None, quantity_points=200):
+    """Evaluate annual total cost on a service level x order quantity grid for every SKU.
+
+    Total cost is the `calc_inv_cost` inventory and stock-out cost plus the
+    holding cost of the safety stock each service level requires; without
+    that term higher service levels would always look free. SKU parameters
+    may be scalars or length-n arrays. `order_quantities` is a shared 1-D
+    grid, or by default `quantity_points` values from 0.1x to 3x each SKU's
+    EOQ. The cost is a service level term plus an order quantity term, so the
+    best quantity is the same at every service level and the grid is never
+    built. Returns the cost-minimizing (SL, Q) per SKU and the frontier: the
+    lowest cost reachable at each service level.
+    """
+    params = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=float)) for p in (
+        demand_mean, demand_std, lead_time, lead_time_std, holding_cost_per_unit, order_cost,
+        stock_out_cost_per_unit)))
+    demand_mean, demand_std, lead_time, lead_time_std, holding, order_cost, stock_out_cost = params
+    n = demand_mean.size
+
+    service_levels = np.linspace(50, 99.9, 200) if service_levels is None else np.asarray(service_levels, dtype=float)
+    if order_quantities is None:
+        eoq = calculate_eoq(demand_mean, order_cost, holding)
+        quantities = eoq[:, None] * np.linspace(0.1, 3, quantity_points)[None, :]
+    else:
+        quantities = np.broadcast_to(np.asarray(order_quantities, dtype=float), (n, len(order_quantities)))
+
+    # Terms that depend only on the service level: (n, m)
+    safety_stock = calculate_safety_stock(demand_std[:, None], lead_time[:, None], lead_time_std[:, None],
+                                          service_levels[None, :])
+    service_cost = (holding[:, None] * safety_stock
+                    + annual_stock_out_cost(demand_mean[:, None], stock_out_cost[:, None], service_levels[None, :]))
+
+    # Terms that depend only on the order quantity: (n, k)
+    quantity_cost = sum(annual_cycle_costs(quantities, holding[:, None], order_cost[:, None], demand_mean[:, None]))
+
+    frontier_index = quantity_cost.argmin(axis=1)
+    frontier_cost = service_cost + quantity_cost.min(axis=1)[:, None]
+    frontier_quantity = np.repeat(quantities[np.arange(n), frontier_index][:, None], service_cost.shape[1], axis=1)
+    best = frontier_cost.argmin(axis=1)
+    sku = np.arange(n)
+    return CostSweep(
+        service_levels=service_levels,
+        frontier_cost=frontier_cost,
+        frontier_quantity=frontier_quantity,
+        best_service_level=service_levels[best],
+        best_order_quantity=frontier_quantity[sku, best],
+        best_cost=frontier_cost[sku, best],
+    )
@@ -0,0 +1,80 @@
+"""Optional debug sidebar for the Streamlit pages.
+
+Usage in a page::
+
+    profiler = start_page_profile("SEIO")
+    ...                                # inputs
+    profiler.stage("calculation")
+    ...
+    finish_page_profile(profiler)
+
+The sidebar gets a collapsed "Debug" expander with toggles for the timing
+panel and a per-rerun cProfile capture. Set `INVENTORY_DEBUG=1` to turn the
+panel on by default. Stage timings are always logged (see
+`inventory.profiling`), whether or not the panel is shown.
+"""
+
+import os
+
+from inventory._lazy import lazy_import
+from inventory.profiling import STAGES, Profiler, current_profiler, stage_metrics
+
+pd = lazy_import('pandas')
+st = lazy_import('streamlit')
+
+
+class PageProfiler(Profiler):
+    """A `Profiler` that remembers the debug expander it reports into."""
+
+    def __init__(self, page, panel, show_panel, cprofile=False):
+        super().__init__(page, cprofile=cprofile)
+        self.panel = panel
+        self.show_panel = show_panel
+
+
+def start_page_profile(page):
+    """Create the debug toggles and start profiling this rerun at the `inputs` stage.
+
+    A profiler left active by a rerun that ended in an exception (including
+    Streamlit's rerun and stop signals) is closed first.
+    """
+    leftover = current_profiler()
+    if leftover is not None:
+        leftover.close()
+    debug = st.sidebar.expander("Debug", expanded=False)
+    show = debug.checkbox("Show timings", value=os.environ.get('INVENTORY_DEBUG') == '1', key='debug_timings')
+    capture = debug.checkbox("Capture cProfile", value=False, key='debug_cprofile')
+    profiler = PageProfiler(page, debug, show, cprofile=capture)
+    profiler.stage('inputs')
+    return profiler
+
+
+def finish_page_profile(profiler):
+    """End the rerun and, when enabled, render its timings into the debug expander."""
+    profiler.finish()
+    if not profiler.show_panel:
+        return
+    panel = profiler.panel
+    panel.write(f"Rerun {profiler.rerun}: {profiler.total * 1000:.1f} ms")
+
+    stages = profiler.stage_totals()
+    order = sorted(stages, key=lambda stage: STAGES.index(stage) if stage in STAGES else len(STAGES))
+    panel.dataframe(pd.DataFrame({'ms': [stages[stage] * 1000 for stage in order]}, index=pd.Index(order, name='Stage')))
+
+    spans = [span for span in profiler.spans if span['name'] is not None]
+    if spans:
+        table = pd.DataFrame(spans).groupby(['stage', 'name'], sort=False, dropna=False)['seconds'].agg(['count', 'sum'])
+        panel.dataframe(table.assign(ms=table.pop('sum') * 1000).rename_axis(['Stage', 'Span']))
+
+    metrics = stage_metrics()
+    page_metrics = {stage: m for (page, stage), m in metrics.items() if page == profiler.page}
+    panel.write("All reruns of this page")
+    panel.dataframe(pd.DataFrame({
+        'reruns': [m['count'] for m in page_metrics.values()],
+        'mean ms': [m['mean'] * 1000 for m in page_metrics.values()],
+        'max ms': [m['max'] * 1000 for m in page_metrics.values()],
+    }, index=pd.Index(list(page_metrics), name='Stage')))
+
+    report = profiler.profile_report()
+    if report is not None:
+        panel.code(report)
@@ -0,0 +1,258 @@
+"""Discrete-event simulation of a warehouse -> customer network.
+
+Instead of ticking every node every day, events are kept on a priority queue
+(`heapq`) and the simulation jumps from one event to the next. Work is
+proportional to the number of demand arrivals and orders, not days x nodes,
+so long horizons and sparse-demand customers are cheap.
+
+* Customers see compound Poisson demand: orders arrive at `Order Rate` per
+  day with `Order Size` units each. These are derived from `Avg. Demand` /
+  `St. Dev. Demand` when not given (see `compound_poisson_from_moments`).
+* Every node follows an (s, Q) policy on its inventory position (on hand +
+  on order - backorders) and may have any number of orders outstanding.
+* Customer orders are filled from their warehouse's stock when it has
+  enough, otherwise they queue (FIFO) until its next replenishment arrives.
+  Warehouses are replenished by an outside supplier. Customers without a
+  warehouse are supplied directly.
+* Unmet customer demand is backordered or lost (`backorders=False`).
+"""
+
+import heapq
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.profiling import instrument
+from inventory.streams import item_seeds
+from inventory.trajectories import open_output
+
+pd = lazy_import('pandas')
+
+# Event kinds; the order also breaks ties between events at the same time
+RECEIPT, DEMAND, SAMPLE = 0, 1, 2
+
+BLOCK_SIZE = 1024  # random numbers drawn per refill of a node's buffer
+
+
+@dataclass
+class EventSimulationResult:
+    """Per-node KPIs of one event-driven run."""
+
+    nodes: 'pd.DataFrame'
+    event_count: int
+    sample_times: np.ndarray = None   # (samples,)
+    on_hand_samples: np.ndarray = None  # float32 (samples, nodes) on-hand snapshot, if `record_every` was set
+
+
+class _RandomBlocks:
+    """Exponential and normal draws served from pre-drawn blocks of one generator."""
+
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self._exponential = iter(())
+        self._normal = iter(())
+
+    def exponential(self):
+        value = next(self._exponential, None)
+        if value is None:
+            self._exponential = iter(self.rng.standard_exponential(BLOCK_SIZE).tolist())
+            value = next(self._exponential)
+        return value
+
+    def normal(self):
+        value = next(self._normal, None)
+        if value is None:
+            self._normal = iter(self.rng.standard_normal(BLOCK_SIZE).tolist())
+            value = next(self._normal)
+        return value
+
+
+def compound_poisson_from_moments(demand_mean, demand_std, min_order_size=1.0):
+    """Order rate and size giving daily demand with (about) the given mean and std.
+
+    With constant order size `k` and rate `r`, daily demand has mean `r k` and
+    variance `r k^2`, so `k = var / mean` and `r = mean / k`. The order size is
+    at least `min_order_size`, which overstates the variance of very smooth
+    demand rather than simulating vanishingly small orders.
+    """
+    demand_mean = np.asarray(demand_mean, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        size = np.maximum(np.square(demand_std) / demand_mean, min_order_size)
+        rate = np.where(demand_mean > 0, demand_mean / size, 0.0)
+    return rate, size
+
+
+@instrument
+def simulate_network_events(customers, warehouses=None, horizon=365, backorders=True, record_every=None,
+                            output=None, seed=None):
+    """Run the event-driven simulation for `horizon` days.
+
+    `customers` columns: `Customer`, `Reorder Point`, `Order Quantity`,
+    `Avg. Lead Time`, `St. Dev. Lead Time` (the lane from its warehouse),
+    either `Order Rate` and `Order Size` or `Avg. Demand` and
+    `St. Dev. Demand`, and optionally `Warehouse` and `Initial Inventory`
+    (default: reorder point + order quantity).
+
+    `warehouses` columns: `Warehouse`, `Reorder Point`, `Order Quantity`,
+    `Avg. Lead Time`, `St. Dev. Lead Time` (from the outside supplier) and
+    optionally `Initial Inventory`.
+
+    Lead times are normal, truncated at zero. With `record_every` set, the on-hand
+    level of every node is also sampled at that interval in days and written
+    to `output` (see `simulation.simulate_sq`).
+    """
+    warehouses = warehouses if warehouses is not None else pd.DataFrame(columns=['Warehouse'])
+    names = list(warehouses['Warehouse']) + list(customers['Customer'])
+    num_warehouses = len(warehouses)
+    n = len(names)
+
+    def column(name, default=None):
+        values = []
+        for table in (warehouses, customers):
+            if name in table:
+                values.extend(table[name].astype(float).tolist())
+            else:
+                values.extend([default] * len(table))
+        return values
+
+    reorder_point = column('Reorder Point')
+    order_quantity = column('Order Quantity')
+    lead_mean = column('Avg. Lead Time')
+    lead_std = column('St. Dev. Lead Time', 0.0)
+    initial = column('Initial Inventory', np.nan)
+    on_hand = [q + r if np.isnan(i) else i for i, r, q in zip(initial, reorder_point, order_quantity)]
+
+    if 'Order Rate' in customers and 'Order Size' in customers:
+        rate, size = customers['Order Rate'].to_numpy(dtype=float), customers['Order Size'].to_numpy(dtype=float)
+    else:
+        rate, size = compound_poisson_from_moments(customers['Avg. Demand'], customers['St. Dev. Demand'])
+    order_rate = [0.0] * num_warehouses + rate.tolist()
+    order_size = [0.0] * num_warehouses + size.tolist()
+
+    warehouse_position = {name: i for i, name in enumerate(warehouses['Warehouse'])}
+    supplier = [-1] * n
+    if 'Warehouse' in customers:
+        for j, warehouse in enumerate(customers['Warehouse']):
+            supplier[num_warehouses + j] = warehouse_position.get(warehouse, -1)
+
+    streams = [_RandomBlocks(child) for child in item_seeds(seed, n)]
+    on_order = [0.0] * n
+    backlog = [0.0] * n                  # customer demand waiting for stock (backorder mode)
+    waiting = [deque() for _ in range(n)]  # warehouse queue of (customer, quantity) orders
+    queued = [0.0] * n                   # units in that queue
+    area = [0.0] * n                     # time integral of on-hand stock
+    last_time = [0.0] * n
+    demand_units = [0.0] * n
+    filled_units = [0.0] * n
+    orders_placed = [0] * n
+
+    events = []
+    sequence = 0
+
+    def schedule(time, kind, node, quantity=0.0):
+        nonlocal sequence
+        if time <= horizon:
+            heapq.heappush(events, (time, kind, sequence, node, quantity))
+            sequence += 1
+
+    def advance(node, time):
+        area[node] += max(on_hand[node], 0.0) * (time - last_time[node])
+        last_time[node] = time
+
+    def lead_time(node):
+        return max(0.0, lead_mean[node] + lead_std[node] * streams[node].normal())
+
+    def ship(node, quantity, time):
+        schedule(time + lead_time(node), RECEIPT, node, quantity)
+
+    def review(node, time):
+        position = on_hand[node] + on_order[node] - backlog[node] - queued[node]
+        while position <= reorder_point[node] and order_quantity[node] > 0:
+            quantity = order_quantity[node]
+            on_order[node] += quantity
+            orders_placed[node] += 1
+            position += quantity
+            source = supplier[node]
+            if source < 0:
+                ship(node, quantity, time)
+                continue
+            demand_units[source] += quantity
+            if on_hand[source] >= quantity and not waiting[source]:
+                filled_units[source] += quantity
+                advance(source, time)
+                on_hand[source] -= quantity
+                ship(node, quantity, time)
+            else:
+                waiting[source].append((node, quantity))
+                queued[source] += quantity
+            review(source, time)
+
+    for node in range(num_warehouses, n):
+        if order_rate[node] > 0:
+            schedule(streams[node].exponential() / order_rate[node], DEMAND, node)
+    sample_times = np.arange(0.0, horizon + 1e-9, record_every) if record_every else None
+    samples = open_output(output, len(sample_times), (n,)) if record_every else None
+    if record_every:
+        for time in sample_times:
+            schedule(float(time), SAMPLE, -1)
+
+    event_count = 0
+    while events:
+        time, kind, _, node, quantity = heapq.heappop(events)
+        event_count += 1
+
+        if kind == SAMPLE:
+            samples.append(on_hand)
+            continue
+
+        advance(node, time)
+        if kind == DEMAND:
+            quantity = order_size[node]
+            demand_units[node] += quantity
+            filled = min(quantity, max(on_hand[node], 0.0))
+            filled_units[node] += filled
+            on_hand[node] -= filled
+            if backorders:
+                backlog[node] += quantity - filled
+            schedule(time + streams[node].exponential() / order_rate[node], DEMAND, node)
+        else:  # RECEIPT
+            on_order[node] -= quantity
+            on_hand[node] += quantity
+            if backlog[node] > 0:
+                cleared = min(backlog[node], on_hand[node])
+                backlog[node] -= cleared
+                on_hand[node] -= cleared
+            # A warehouse releases queued customer orders in arrival order
+            while waiting[node] and on_hand[node] >= waiting[node][0][1]:
+                customer, order = waiting[node].popleft()
+                on_hand[node] -= order
+                queued[node] -= order
+                ship(customer, order, time)
+        review(node, time)
+
+    for node in range(n):
+        advance(node, horizon)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fill_rate = np.where(np.array(demand_units) > 0, np.array(filled_units) / np.array(demand_units), np.nan)
+    result = pd.DataFrame({
+        'Node': names,
+        'Tier': ['Warehouse'] * num_warehouses + ['Customer'] * (n - num_warehouses),
+        'Avg. On Hand': np.array(area) / horizon if horizon > 0 else np.array(on_hand),
+        'Ending On Hand': on_hand,
+        'Ending Backorders': backlog,
+        'Queued Orders': [len(queue) for queue in waiting],
+        'Demand Units': demand_units,
+        'Fill Rate': fill_rate,
+        'Orders Placed': orders_placed,
+    })
+    if record_every:
+        samples.flush()
+    return EventSimulationResult(
+        nodes=result,
+        event_count=event_count,
+        sample_times=sample_times,
+        on_hand_samples=samples.data if record_every else None,
+    )
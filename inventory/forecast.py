@@ -0,0 +1,167 @@
+"""Vectorized exponential-smoothing forecasts for many demand series at once.
+
+Series are rows of a 2-D `(series, periods)` array (NaN for missing
+periods). Every series gets an additive Holt-Winters model (level, trend and,
+with `season_length > 1`, seasonality) in error-correction form::
+
+    e_t = y_t - (l + b + s_{t-m})
+    l  <- l + b + alpha * e_t
+    b  <- b + alpha * beta * e_t
+    s_t = s_{t-m} + gamma * e_t
+
+The smoothing parameters are picked per series from a small grid by one-step
+squared error. All grid points and series are filtered together, one NumPy
+operation per period, in chunks of series that bound memory. Forecast error
+variance at horizon `h` is `sigma^2 * (1 + sum_{j<h} c_j^2)` with
+`c_j = alpha * (1 + j * beta) + gamma * [j mod m == 0]`.
+"""
+
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.calculations import DEMAND_MEAN, DEMAND_STD
+from inventory.profiling import instrument
+
+pd = lazy_import('pandas')
+
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.0, 0.05, 0.1, 0.2)
+GAMMAS = (0.0, 0.05, 0.1, 0.2)
+MAX_FILTER_CELLS = 2e7  # state values held while filtering one chunk of series
+
+
+@dataclass
+class ForecastResult:
+    """Per-series forecasts and fitted parameters, each with one row per series."""
+
+    mean: np.ndarray   # (series, horizon) forecast per period ahead
+    std: np.ndarray    # (series, horizon) forecast error std per period ahead
+    alpha: np.ndarray
+    beta: np.ndarray
+    gamma: np.ndarray
+    sigma: np.ndarray  # one-step error std
+    season_length: int
+
+    def lead_time_demand(self, lead_time):
+        """Mean and std of total demand over the next `lead_time` periods (int or per series).
+
+        Errors of successive periods are correlated through the smoothed
+        states, so the variance of the sum is
+        `sigma^2 * sum_i (1 + C_{L-i})^2` with `C_k = c_1 + ... + c_k`.
+        """
+        lead_time = np.broadcast_to(np.asarray(lead_time, dtype=int), self.sigma.shape)
+        horizon = self.mean.shape[1]
+        if lead_time.max(initial=0) > horizon:
+            raise ValueError(f"Lead time exceeds the forecast horizon of {horizon} periods")
+        mean = np.concatenate([np.zeros((len(lead_time), 1)), np.cumsum(self.mean, axis=1)], axis=1)
+        total = np.take_along_axis(mean, lead_time[:, None], axis=1)[:, 0]
+
+        cumulative_c = np.concatenate([np.zeros((len(lead_time), 1)),
+                                       np.cumsum(_error_weights(self, horizon), axis=1)], axis=1)
+        # Coefficient of the error i periods ahead is 1 + C_{L-i}, for i = 1..L
+        offsets = lead_time[:, None] - np.arange(1, horizon + 1)[None, :]
+        weights = np.where(offsets >= 0, 1 + np.take_along_axis(cumulative_c, np.maximum(offsets, 0), axis=1), 0.0)
+        return total, self.sigma * np.sqrt(np.square(weights).sum(axis=1))
+
+    def to_frame(self, index=None, horizon=1):
+        """Per-period demand mean and std `horizon` periods ahead, in the MEIO column names."""
+        return pd.DataFrame({DEMAND_MEAN: self.mean[:, horizon - 1], DEMAND_STD: self.std[:, horizon - 1]},
+                            index=index)
+
+
+@instrument
+def fit_holt_winters(series, season_length=1, horizon=30, alphas=ALPHAS, betas=BETAS, gammas=GAMMAS):
+    """Fit one additive Holt-Winters model per row of `series` and forecast `horizon` periods.
+
+    Seasonality needs at least two full seasons of history; with fewer
+    periods (or `season_length=1`) only level and trend are fitted.
+    """
+    series = np.atleast_2d(np.asarray(series, dtype=float))
+    num_series, periods = series.shape
+    m = season_length if season_length > 1 and periods >= 2 * season_length else 1
+    grid = np.array([(a, b, g) for a, b, g in itertools.product(alphas, betas, gammas if m > 1 else (0.0,))
+                     if g <= 1 - a])
+
+    params = np.empty((num_series, 3))
+    chunk = max(1, int(MAX_FILTER_CELLS // (len(grid) * (m + 4))))  # states per grid point and series
+    for start in range(0, num_series, chunk):
+        rows = series[start:start + chunk]
+        sse, _ = _filter(rows, m, grid[:, 0, None], grid[:, 1, None], grid[:, 2, None])
+        params[start:start + chunk] = grid[np.argmin(sse, axis=0)]
+    alpha, beta, gamma = params.T
+
+    sse, (level, trend, seasonal, count) = _filter(series, m, alpha, beta, gamma)
+    sigma = np.sqrt(sse / np.maximum(count - 1, 1))
+
+    steps = np.arange(1, horizon + 1)
+    season_index = (periods - 1 + steps) % m
+    mean = level[:, None] + steps[None, :] * trend[:, None] + seasonal[:, season_index]
+    result = ForecastResult(mean=mean, std=None, alpha=alpha, beta=beta, gamma=gamma, sigma=sigma, season_length=m)
+    c = _error_weights(result, horizon)
+    cumulative = np.concatenate([np.zeros((num_series, 1)), np.cumsum(np.square(c), axis=1)[:, :-1]], axis=1)
+    result.std = sigma[:, None] * np.sqrt(1 + cumulative)
+    return result
+
+
+def forecast_statistics(history, season_length=1, horizon=1):
+    """Fit every row of a `(keys x periods)` history frame and return per-key demand inputs.
+
+    The result has `Avg. Demand` and `St. Dev. Demand` for the period
+    `horizon` steps ahead, indexed like `history` (see `ingest.demand_matrix`).
+    """
+    result = fit_holt_winters(history.to_numpy(dtype=float), season_length=season_length, horizon=horizon)
+    return result.to_frame(index=history.index, horizon=horizon)
+
+
+def _filter(series, m, alpha, beta, gamma):
+    """Run the smoothing recursions; returns (SSE, final states) shaped like `alpha x series`.
+
+    `alpha`, `beta` and `gamma` broadcast against the series axis: `(grid, 1)`
+    evaluates every grid point for every series, `(series,)` one set each.
+    """
+    num_series, periods = series.shape
+    level, trend, seasonal = _initial_states(series, m)
+    shape = np.broadcast_shapes(np.shape(alpha), (num_series,))
+    level = np.broadcast_to(level, shape).copy()
+    trend = np.broadcast_to(trend, shape).copy()
+    seasonal = np.broadcast_to(seasonal, shape[:-1] + seasonal.shape).copy()
+    sse = np.zeros(shape)
+    count = np.zeros(num_series)
+    alpha_beta = alpha * beta
+
+    for t in range(periods):
+        y = series[:, t]
+        observed = ~np.isnan(y)
+        season = seasonal[..., t % m]
+        error = np.where(observed, y - (level + trend + season), 0.0)
+        sse += error * error
+        count += observed
+        level += trend + alpha * error
+        trend += alpha_beta * error
+        if m > 1:
+            season += gamma * error
+    return sse, (level, trend, seasonal, count)
+
+
+def _initial_states(series, m):
+    """Level, trend and seasonal indices from the first periods of each series."""
+    filled = np.where(np.isnan(series), np.nanmean(series, axis=1, keepdims=True), series)
+    filled = np.nan_to_num(filled)
+    if m > 1:
+        first, second = filled[:, :m].mean(axis=1), filled[:, m:2 * m].mean(axis=1)
+        trend = (second - first) / m
+        level = first - trend * (m - 1) / 2  # level at the first observation
+        seasonal = filled[:, :m] - (first[:, None] + trend[:, None] * (np.arange(m) - (m - 1) / 2))
+        return level - trend, trend, seasonal  # states one period before the first observation
+    trend = filled[:, 1] - filled[:, 0] if series.shape[1] > 1 else np.zeros(len(series))
+    return filled[:, 0] - trend, trend, np.zeros((len(series), 1))
+
+
+def _error_weights(result, horizon):
+    """`c_j` for j = 1 .. horizon - 1 per series (the last column is unused padding)."""
+    j = np.arange(1, horizon + 1)
+    seasonal = (j % result.season_length == 0) if result.season_length > 1 else np.zeros(horizon, dtype=bool)
+    return result.alpha[:, None] * (1 + j[None, :] * result.beta[:, None]) + result.gamma[:, None] * seasonal[None, :]
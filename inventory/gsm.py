@@ -0,0 +1,164 @@
+"""Guaranteed-service model (GSM) safety stock placement over a distribution tree.
+
+Each node `j` quotes an outbound service time `S_j` to its children and is
+quoted an inbound service time `SI_j` by its parent (0 at the root). It holds
+safety stock for its net replenishment time `tau_j = SI_j + T_j - S_j`::
+
+    safety stock_j = z_j * sigma_j * sqrt(tau_j)
+
+where `T_j` is its own lead time and `sigma_j` the standard deviation of the
+daily demand it serves (pooled over its children). Committed service times
+are chosen to minimize total safety stock holding cost by dynamic programming
+from the leaves up. The node cost is tabulated over every inbound service
+time, and each table is evaluated as one NumPy array operation over
+(inbound, outbound) service time pairs.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.calculations import service_level_to_z
+from inventory.network import _column
+from inventory.profiling import instrument
+
+pd = lazy_import('pandas')
+
+
+@dataclass
+class _NodeTable:
+    best_cost: np.ndarray      # minimal subtree cost per inbound service time
+    best_service: np.ndarray   # outbound service time achieving it
+
+
+@instrument
+def optimize_service_times(nodes, edges):
+    """Place safety stock across a distribution tree with the guaranteed-service model.
+
+    `nodes` columns: `Node`, `Lead Time` (integer days), `Holding $/Unit`,
+    and optionally `St. Dev. Demand` (external daily demand std, default 0),
+    `Service Level` (percent, default 95) and `Max Service Time` (the most an
+    end customer tolerates; default 0 for nodes without children and no
+    limit otherwise). `edges` columns: `Parent`, `Child`. Every node has at
+    most one parent; nodes without a parent are replenished from an outside
+    supplier with their own lead time.
+
+    Returns one row per node with the inbound/outbound service times, net
+    replenishment time, safety stock and its holding cost.
+    """
+    names = list(nodes['Node'])
+    position = {name: i for i, name in enumerate(names)}
+    if len(position) != len(names):
+        raise ValueError("Node names must be unique")
+    n = len(names)
+
+    lead_time = nodes['Lead Time'].to_numpy(dtype=float)
+    if np.any(lead_time < 0) or np.any(lead_time != np.round(lead_time)):
+        raise ValueError("The guaranteed-service model needs non-negative integer lead times")
+    lead_time = lead_time.astype(int)
+    holding = nodes['Holding $/Unit'].to_numpy(dtype=float)
+    demand_std = _column(nodes, 'St. Dev. Demand', 0.0)
+    z = service_level_to_z(_column(nodes, 'Service Level', 95.0))
+
+    parent = np.full(n, -1)
+    children = [[] for _ in range(n)]
+    for p, c in zip(edges['Parent'], edges['Child']):
+        if p not in position or c not in position:
+            raise ValueError(f"Edge {p} -> {c} refers to an unknown node")
+        if parent[position[c]] != -1:
+            raise ValueError(f"Node {c} has more than one parent; the DP needs a tree")
+        parent[position[c]] = position[p]
+        children[position[p]].append(position[c])
+
+    max_service = _column(nodes, 'Max Service Time', np.nan)
+    no_children = np.array([not kids for kids in children])
+    max_service = np.where(np.isnan(max_service), np.where(no_children, 0, np.inf), max_service)
+
+    order = _topological_order(parent, children)  # roots first
+
+    # Longest possible inbound service time: the lead times of all ancestors
+    max_inbound = np.zeros(n, dtype=int)
+    for j in order:
+        if parent[j] >= 0:
+            max_inbound[j] = max_inbound[parent[j]] + lead_time[parent[j]]
+
+    # Pooled demand variability, leaves up
+    sigma = demand_std.copy()
+    for j in reversed(order):
+        if parent[j] >= 0:
+            sigma[parent[j]] = np.sqrt(sigma[parent[j]] ** 2 + sigma[j] ** 2)
+
+    unit_cost = holding * z * sigma  # cost per sqrt(day) of net replenishment time
+    tables = [None] * n
+    for j in reversed(order):
+        inbound = np.arange(max_inbound[j] + 1)
+        outbound = np.arange(max_inbound[j] + lead_time[j] + 1)
+        child_cost = np.zeros(outbound.size)
+        for c in children[j]:
+            child_cost += tables[c].best_cost[:outbound.size]
+
+        tau = inbound[:, None] + lead_time[j] - outbound[None, :]
+        feasible = (tau >= 0) & (outbound[None, :] <= max_service[j])
+        total = np.where(feasible, unit_cost[j] * np.sqrt(np.maximum(tau, 0)) + child_cost[None, :], np.inf)
+        best_service = total.argmin(axis=1)
+        tables[j] = _NodeTable(best_cost=total[inbound, best_service], best_service=best_service)
+
+    inbound_service = np.zeros(n, dtype=int)
+    outbound_service = np.zeros(n, dtype=int)
+    for j in order:
+        inbound_service[j] = outbound_service[parent[j]] if parent[j] >= 0 else 0
+        if not np.isfinite(tables[j].best_cost[inbound_service[j]]):
+            raise ValueError(f"No feasible service times for node {names[j]}; check its Max Service Time")
+        outbound_service[j] = tables[j].best_service[inbound_service[j]]
+
+    net_time = inbound_service + lead_time - outbound_service
+    safety_stock = z * sigma * np.sqrt(net_time)
+    return pd.DataFrame({
+        'Node': names,
+        'Inbound Service Time': inbound_service,
+        'Outbound Service Time': outbound_service,
+        'Net Replenishment Time': net_time,
+        'Pooled St. Dev. Demand': sigma,
+        'Safety Stock': safety_stock,
+        'Safety Stock Cost': holding * safety_stock,
+    })
+
+
+def network_from_echelons(echelon1_df, echelon2_df, network_df, warehouse_lead_time):
+    """Build GSM node and edge tables from the MEIO page's warehouse, customer and network tables.
+
+    Warehouses use `warehouse_lead_time` unless `echelon1_df` has an
+    `Avg. Lead Time` column; customers use the lane's `Avg. Lead Time` from
+    `network_df`, rounded up to whole days.
+    """
+    lanes = network_df.drop_duplicates('Customer').set_index('Customer')
+    warehouse_lead = (echelon1_df['Avg. Lead Time'] if 'Avg. Lead Time' in echelon1_df
+                      else pd.Series(warehouse_lead_time, index=echelon1_df.index))
+    warehouses = pd.DataFrame({
+        'Node': echelon1_df['Warehouse'],
+        'Lead Time': np.ceil(warehouse_lead.to_numpy(dtype=float)),
+        'Holding $/Unit': echelon1_df['Holding $/Unit'],
+        'St. Dev. Demand': 0.0,
+        'Service Level': echelon2_df['Service Level'].max(),
+    })
+    customers = pd.DataFrame({
+        'Node': echelon2_df['Customer'],
+        'Lead Time': np.ceil(echelon2_df['Customer'].map(lanes['Avg. Lead Time']).to_numpy(dtype=float)),
+        'Holding $/Unit': echelon2_df['Holding $/Unit'],
+        'St. Dev. Demand': echelon2_df['St. Dev. Demand'],
+        'Service Level': echelon2_df['Service Level'],
+        'Max Service Time': echelon2_df['Max Service Time'] if 'Max Service Time' in echelon2_df else 0,
+    })
+    nodes = pd.concat([warehouses, customers], ignore_index=True)
+    edges = network_df[['Warehouse', 'Customer']].drop_duplicates('Customer').set_axis(['Parent', 'Child'], axis=1)
+    return nodes, edges
+
+
+def _topological_order(parent, children):
+    order = [j for j in range(len(parent)) if parent[j] < 0]
+    for j in order:  # the list grows while it is walked, giving a breadth-first order
+        order.extend(children[j])
+    if len(order) != len(parent):
+        raise ValueError("The network contains a cycle")
+    return order
@@ -0,0 +1,62 @@
+"""Import-time report for the calculation core.
+
+Usage::
+
+    python -m inventory.importtime [module ...]
+
+Each module is imported in a fresh interpreter with `-X importtime`. The
+report lists its cold import time and which heavy dependencies were pulled in
+eagerly. `inventory._lazy.import_report()` covers the deferred imports made
+later in a running process.
+"""
+
+import subprocess
+import sys
+
+CORE_MODULES = [
+    'inventory',
+    'inventory.calculations',
+    'inventory.simulation',
+    'inventory.costs',
+    'inventory.network',
+    'inventory.saa',
+    'inventory.gsm',
+    'inventory.events',
+    'inventory.trajectories',
+    'inventory.charts',
+    'inventory.forecast',
+    'inventory.ingest',
+    'inventory.cli',
+]
+HEAVY_DEPENDENCIES = ['pandas', 'scipy', 'matplotlib', 'streamlit', 'highspy', 'pyarrow']
+
+
+def cold_import(module):
+    """Return (cumulative seconds, eagerly imported heavy dependencies) for importing `module`."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          capture_output=True, text=True, check=True)
+    seconds = 0.0
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        fields = [field.strip() for field in line[len('import time:'):].split('|')]
+        if not fields[1].isdigit():
+            continue  # header row
+        name = fields[2]
+        imported.add(name.split('.')[0])
+        if name == module:
+            seconds = int(fields[1]) / 1e6
+    return seconds, [dep for dep in HEAVY_DEPENDENCIES if dep in imported]
+
+
+def main(argv=None):
+    modules = (sys.argv[1:] if argv is None else argv) or CORE_MODULES
+    print(f"{'module':<28} {'import':>10}  eager heavy dependencies")
+    for module in modules:
+        seconds, heavy = cold_import(module)
+        print(f"{module:<28} {seconds * 1000:>7.1f} ms  {', '.join(heavy) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""Streaming ingestion of demand and lead-time history files.
+
+History files (CSV or Parquet) are read in chunks and reduced to per-key
+count / mean / sum of squared deviations, merged across chunks with the
+parallel form of Welford's algorithm. Peak memory is proportional to the
+number of keys, not the number of rows, so arbitrarily long histories can be
+summarized into the `Avg. Demand`, `St. Dev. Demand`, `Avg. Lead Time` and
+`St. Dev. Lead Time` inputs used by the safety stock calculations.
+"""
+
+import os
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.calculations import DEMAND_MEAN, DEMAND_STD, LEAD_TIME, LEAD_TIME_STD
+from inventory.profiling import instrument
+
+pd = lazy_import('pandas')
+
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+class RunningStats:
+    """Per-key running count, mean and M2 (sum of squared deviations)."""
+
+    def __init__(self):
+        self.stats = None
+
+    def update(self, keys, values):
+        """Fold one chunk of `values` grouped by `keys` (Series or list of Series) into the totals."""
+        chunk = values.groupby(keys, sort=False).agg(['count', 'mean', 'var'])
+        chunk = chunk[chunk['count'] > 0]
+        chunk['m2'] = chunk.pop('var').fillna(0.0) * (chunk['count'] - 1)
+        self.merge(chunk)
+
+    def merge(self, other):
+        """Merge a frame with `count`, `mean` and `m2` columns (Chan et al. pairwise update)."""
+        if self.stats is None:
+            self.stats = other[['count', 'mean', 'm2']].astype(float)
+            return
+        index = self.stats.index.union(other.index)
+        a = self.stats.reindex(index, fill_value=0.0)
+        b = other[['count', 'mean', 'm2']].astype(float).reindex(index, fill_value=0.0)
+        count = a['count'] + b['count']
+        delta = b['mean'] - a['mean']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = (b['count'] / count).fillna(0.0)
+        self.stats = pd.DataFrame({
+            'count': count,
+            'mean': a['mean'] + delta * weight,
+            'm2': a['m2'] + b['m2'] + delta ** 2 * a['count'] * weight,
+        })
+
+    def result(self, ddof=1):
+        """Return a frame with `count`, `mean` and `std` per key."""
+        if self.stats is None:
+            return pd.DataFrame(columns=['count', 'mean', 'std'])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self.stats['m2'] / (self.stats['count'] - ddof))
+        return pd.DataFrame({'count': self.stats['count'], 'mean': self.stats['mean'], 'std': std})
+
+
+def iter_chunks(path, columns, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrame chunks of `columns` from a CSV or Parquet file path or file object."""
+    if _is_parquet(path):
+        for batch in _parquet().ParquetFile(path).iter_batches(batch_size=chunksize, columns=list(columns)):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=list(columns), chunksize=chunksize)
+
+
+def table_columns(path):
+    """Column names of a CSV or Parquet file path or file object, read from its header only."""
+    if _is_parquet(path):
+        columns = list(_parquet().ParquetFile(path).schema_arrow.names)
+    else:
+        columns = list(pd.read_csv(path, nrows=0).columns)
+    if hasattr(path, 'seek'):
+        path.seek(0)
+    return columns
+
+
+def _is_parquet(path):
+    name = getattr(path, 'name', path)  # uploaded file objects carry the original file name
+    return os.fspath(name).endswith(('.parquet', '.pq'))
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Reading Parquet history files requires pyarrow") from exc
+    return pq
+
+
+class DateSpan:
+    """Per-key first and last observed date."""
+
+    def __init__(self):
+        self.first = None
+        self.last = None
+
+    def update(self, keys, dates):
+        span = pd.to_datetime(dates).groupby(keys, sort=False).agg(['min', 'max'])
+        levels = list(range(span.index.nlevels))
+        self.first = span['min'] if self.first is None else pd.concat([self.first, span['min']]).groupby(level=levels).min()
+        self.last = span['max'] if self.last is None else pd.concat([self.last, span['max']]).groupby(level=levels).max()
+
+    def days(self):
+        return (self.last - self.first).dt.days + 1
+
+
+def streaming_statistics(chunks, keys, values, date=None):
+    """Reduce an iterable of DataFrame chunks to per-key `count`, `mean` and `std`.
+
+    Returns a dict mapping each column in `values` to its statistics frame;
+    rows where that column is missing are skipped. When `date` names a date
+    column, each key is assumed to have one row per day with zero-demand days
+    omitted, and the days between a key's first and last date that have no
+    row are counted as zeros for the first column in `values`.
+    """
+    keys = list(keys)
+    running = {value: RunningStats() for value in values}
+    span = DateSpan()
+
+    for chunk in chunks:
+        for value, stats in running.items():
+            rows = chunk[chunk[value].notna()]
+            if not rows.empty:
+                stats.update([rows[k] for k in keys], rows[value].astype(float))
+        if date is not None and not chunk.empty:
+            span.update([chunk[k] for k in keys], chunk[date])
+
+    zero_filled = running[values[0]]
+    if date is not None and zero_filled.stats is not None:
+        zeros = (span.days().reindex(zero_filled.stats.index) - zero_filled.stats['count']).clip(lower=0)
+        zero_filled.merge(pd.DataFrame({'count': zeros, 'mean': 0.0, 'm2': 0.0}))
+
+    results = {}
+    for value, stats in running.items():
+        results[value] = stats.result()
+        results[value].index.names = keys
+    return results
+
+
+@instrument
+def demand_statistics(path, keys=('SKU', 'Location'), quantity='Quantity', date=None, lead_time=None,
+                      chunksize=DEFAULT_CHUNKSIZE):
+    """Summarize a daily demand history file into safety stock inputs per key.
+
+    Returns one row per key with `Avg. Demand`, `St. Dev. Demand` and
+    `Observations`. When `lead_time` names a column holding observed
+    replenishment lead times (missing on rows without a receipt), the same
+    pass also fills `Avg. Lead Time` and `St. Dev. Lead Time`. See
+    `streaming_statistics` for the meaning of `date`.
+    """
+    keys = list(keys)
+    values = [quantity] + ([lead_time] if lead_time else [])
+    columns = keys + values + ([date] if date else [])
+
+    stats = streaming_statistics(iter_chunks(path, columns, chunksize), keys, values, date=date)
+    demand = stats[quantity]
+    result = pd.DataFrame({
+        DEMAND_MEAN: demand['mean'],
+        DEMAND_STD: demand['std'],
+        'Observations': demand['count'].astype(int),
+    })
+    if lead_time is not None:
+        result[LEAD_TIME] = stats[lead_time]['mean'].reindex(result.index)
+        result[LEAD_TIME_STD] = stats[lead_time]['std'].reindex(result.index)
+    return result
+
+
+def lead_time_statistics(path, keys=('SKU', 'Location'), lead_time='Lead Time', chunksize=DEFAULT_CHUNKSIZE):
+    """Summarize a receipts file of observed lead times into `Avg. Lead Time` / `St. Dev. Lead Time` per key."""
+    keys = list(keys)
+    lead = streaming_statistics(iter_chunks(path, keys + [lead_time], chunksize), keys, [lead_time])[lead_time]
+    return pd.DataFrame({LEAD_TIME: lead['mean'], LEAD_TIME_STD: lead['std']})
+
+
+@instrument
+def demand_matrix(path, keys=('SKU', 'Location'), quantity='Quantity', date='Date', chunksize=DEFAULT_CHUNKSIZE):
+    """Read a daily demand history file into a `(keys x days)` frame for `inventory.forecast`.
+
+    Quantities are summed per key and day. Days without a row between the
+    first and last date in the file are zero demand.
+    """
+    keys = list(keys)
+    daily = []
+    for chunk in iter_chunks(path, keys + [quantity, date], chunksize):
+        chunk[date] = pd.to_datetime(chunk[date])
+        daily.append(chunk.groupby(keys + [date], sort=False)[quantity].sum())
+    totals = pd.concat(daily).groupby(level=list(range(len(keys) + 1))).sum()
+    matrix = totals.unstack(date, fill_value=0.0)
+    days = pd.date_range(matrix.columns.min(), matrix.columns.max(), freq='D')
+    return matrix.reindex(columns=days, fill_value=0.0).astype(float)
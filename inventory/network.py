@@ -0,0 +1,263 @@
+"""Inventory allocation LP for general supply networks.
+
+A network is described by two tables:
+
+* nodes: one row per location with columns `Node`, optional `Demand`
+  (external demand served at the node, default 0) and optional
+  `Holding Cost` (cost per unit stocked, default 1).
+* edges: one row per lane with columns `Source`, `Target` and optional
+  `Cost` (cost per unit shipped, default 0).
+
+Nodes with no incoming edge are supply nodes and are not stocked. Every other
+node `n` gets an inventory variable `x_n` and every edge `e` a flow variable
+`f_e`, linked by two balance rows per stocked node::
+
+    sum(inbound f) - x_n = 0
+    x_n - sum(outbound f) = demand_n
+
+The constraint matrix is assembled directly in sparse COO form, so memory is
+linear in the number of edges however many tiers the network has.
+"""
+
+import importlib.util
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.profiling import instrument, span
+
+pd = lazy_import('pandas')
+sparse = lazy_import('scipy.sparse')
+optimize = lazy_import('scipy.optimize')
+
+# HiGHS bindings are optional; NetworkSolver falls back to linprog without them
+highspy = lazy_import('highspy') if importlib.util.find_spec('highspy') is not None else None
+
+
+@dataclass
+class NetworkLP:
+    """Sparse LP in `linprog` form plus the labels needed to read the solution."""
+
+    c: np.ndarray
+    A_eq: 'sparse.csr_matrix'
+    b_eq: np.ndarray
+    stocked_nodes: 'pd.Index'
+    edges: 'pd.DataFrame'
+    demand_rows: np.ndarray  # row of the `x_n - outbound = demand_n` constraint per stocked node
+
+    @property
+    def num_vars(self):
+        return self.A_eq.shape[1]
+
+
+def network_from_tiers(tiers, cost_matrix):
+    """Build node and edge tables from ordered tier lists and a nested cost dict.
+
+    `cost_matrix[source][target]` is the unit shipping cost of each lane, as
+    in the Advanced page.
+    """
+    nodes = pd.DataFrame({'Node': [node for tier in tiers for node in tier]})
+    edges = pd.DataFrame(
+        [(source, target, cost) for source, targets in cost_matrix.items() for target, cost in targets.items()],
+        columns=['Source', 'Target', 'Cost'])
+    return nodes, edges
+
+
+@instrument
+def build_network_lp(nodes, edges):
+    """Assemble the allocation LP for the network described by `nodes` and `edges`."""
+    node_index = pd.Index(nodes['Node'])
+    if not node_index.is_unique:
+        raise ValueError("Node names must be unique")
+    source = node_index.get_indexer(edges['Source'])
+    target = node_index.get_indexer(edges['Target'])
+    if (source < 0).any() or (target < 0).any():
+        raise ValueError("Every edge must connect two nodes listed in the node table")
+
+    demand = _column(nodes, 'Demand', 0.0)
+    holding_cost = _column(nodes, 'Holding Cost', 1.0)
+    edge_cost = _column(edges, 'Cost', 0.0)
+
+    # Stocked nodes are those with at least one inbound edge
+    stocked = np.zeros(len(node_index), dtype=bool)
+    stocked[target] = True
+    stocked_position = np.full(len(node_index), -1)
+    stocked_position[stocked] = np.arange(stocked.sum())
+    num_stocked = int(stocked.sum())
+    num_edges = len(edges)
+
+    # Variables: [x_0 .. x_{S-1}, f_0 .. f_{E-1}]
+    # Rows: [inbound balance per stocked node, outbound balance per stocked node]
+    edge_vars = num_stocked + np.arange(num_edges)
+    stock_vars = np.arange(num_stocked)
+    outbound = stocked_position[source] >= 0  # edges leaving a stocked (non-supply) node
+
+    rows = np.concatenate([
+        stocked_position[target],                    # +f_e in the target's inbound row
+        stock_vars,                                  # -x_n in its inbound row
+        num_stocked + stock_vars,                    # +x_n in its outbound row
+        num_stocked + stocked_position[source][outbound],  # -f_e in the source's outbound row
+    ])
+    cols = np.concatenate([edge_vars, stock_vars, stock_vars, edge_vars[outbound]])
+    data = np.concatenate([
+        np.ones(num_edges), -np.ones(num_stocked), np.ones(num_stocked), -np.ones(outbound.sum())])
+    A_eq = sparse.coo_matrix((data, (rows, cols)), shape=(2 * num_stocked, num_stocked + num_edges)).tocsr()
+
+    b_eq = np.concatenate([np.zeros(num_stocked), demand[stocked]])
+    c = np.concatenate([holding_cost[stocked], edge_cost])
+
+    return NetworkLP(
+        c=c,
+        A_eq=A_eq,
+        b_eq=b_eq,
+        stocked_nodes=node_index[stocked],
+        edges=edges[['Source', 'Target']].reset_index(drop=True),
+        demand_rows=num_stocked + stock_vars,
+    )
+
+
+@instrument
+def solve_network_lp(lp):
+    """Solve `lp` with HiGHS and return (inventory per stocked node, flow per edge).
+
+    Returns zeros when the LP is infeasible, like the Advanced page did.
+    """
+    res = optimize.linprog(lp.c, A_eq=lp.A_eq, b_eq=lp.b_eq, bounds=(0, None), method='highs')
+    return split_solution(lp, res.x if res.success else np.zeros(lp.num_vars))
+
+
+def optimize_network(nodes, edges, demand_scenarios=None):
+    """Build and solve the network LP in one call.
+
+    Returns (inventory, flows, scenario inventory); the last item holds one
+    row per row of `demand_scenarios` (see `NetworkSolver.solve_scenarios`)
+    and is None when no scenarios are given.
+    """
+    solver = NetworkSolver(build_network_lp(nodes, edges))
+    inventory, flows = solver.solve()
+    scenario_inventory = None if demand_scenarios is None else solver.solve_scenarios(demand_scenarios)
+    return inventory, flows, scenario_inventory
+
+
+def network_solver(nodes, edges):
+    """A `NetworkSolver` for the network structure, with demand left to `solve(demand=...)`.
+
+    Only the node names and holding costs and the edges enter the LP, so one
+    session serves every demand; keep it across reruns (`cache.network_solver`)
+    to warm-start each new demand from the previous basis.
+    """
+    return NetworkSolver(build_network_lp(nodes.drop(columns='Demand', errors='ignore'), edges))
+
+
+class NetworkSolver:
+    """Persistent solver session for repeated solves of one network LP.
+
+    The constraint matrix is built once. `solve` only pushes the changed
+    demand RHS and/or costs to the solver and returns the cached answer when
+    nothing changed. With the `highspy` package installed the HiGHS model is
+    kept alive between calls, so each re-solve warm-starts dual simplex from
+    the previous optimal basis; otherwise every solve is a cold `linprog`
+    call on the shared sparse matrix. Calls are serialized, so one session
+    can be shared between threads.
+    """
+
+    def __init__(self, lp):
+        self.lp = lp
+        self.b_eq = lp.b_eq.copy()
+        self.c = lp.c.copy()
+        self.solve_count = 0
+        self._last_x = None
+        self._lock = threading.RLock()
+        self._highs = self._build_highs() if highspy is not None else None
+
+    @property
+    def warm_start(self):
+        return self._highs is not None
+
+    def solve(self, demand=None, costs=None):
+        """Re-solve with new demand per stocked node and/or new variable costs.
+
+        `demand` is an array aligned with `lp.stocked_nodes` or a Series/dict
+        keyed by node name (missing nodes get zero demand). `costs` is a full
+        cost vector. Returns (inventory per stocked node, flow per edge).
+        """
+        with self._lock:
+            b_eq = self.b_eq.copy()
+            if demand is not None:
+                b_eq[self.lp.demand_rows] = self._align_demand(demand)
+            c = self.c if costs is None else np.asarray(costs, dtype=float)
+
+            changed_rows = np.flatnonzero(b_eq != self.b_eq)
+            changed_cols = np.flatnonzero(c != self.c)
+            if self._last_x is None or changed_rows.size or changed_cols.size:
+                self._last_x = self._run(b_eq, c, changed_rows, changed_cols)
+                self.b_eq, self.c = b_eq, c.copy()
+            return split_solution(self.lp, self._last_x)
+
+    def solve_scenarios(self, demands):
+        """Solve once per row of `demands` (scenarios x stocked nodes, or a DataFrame
+        whose columns are node names) and return the inventory per scenario.
+        """
+        index = demands.index if isinstance(demands, pd.DataFrame) else None
+        rows = demands.to_dict('records') if index is not None else np.asarray(demands, dtype=float)
+        with self._lock:
+            inventory = [self.solve(demand=row)[0] for row in rows]
+        return pd.DataFrame(inventory, index=index).rename_axis(columns='Location')
+
+    def _align_demand(self, demand):
+        if isinstance(demand, (pd.Series, dict)):
+            return pd.Series(demand, dtype=float).reindex(self.lp.stocked_nodes, fill_value=0.0).to_numpy()
+        return np.broadcast_to(np.asarray(demand, dtype=float), (len(self.lp.stocked_nodes),))
+
+    def _run(self, b_eq, c, changed_rows, changed_cols):
+        self.solve_count += 1
+        if self._highs is None:
+            with span('linprog'):
+                res = optimize.linprog(c, A_eq=self.lp.A_eq, b_eq=b_eq, bounds=(0, None), method='highs')
+            return res.x if res.success else np.zeros(self.lp.num_vars)
+
+        if changed_rows.size:
+            values = b_eq[changed_rows]
+            self._highs.changeRowsBounds(changed_rows.size, changed_rows.astype(np.int32), values, values)
+        if changed_cols.size:
+            self._highs.changeColsCost(changed_cols.size, changed_cols.astype(np.int32), c[changed_cols])
+        with span('highs warm start'):
+            self._highs.run()
+        if self._highs.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+            return np.zeros(self.lp.num_vars)
+        return np.array(self._highs.getSolution().col_value)
+
+    def _build_highs(self):
+        A = self.lp.A_eq.tocsc()
+        model = highspy.HighsLp()
+        model.num_col_, model.num_row_ = A.shape[1], A.shape[0]
+        model.col_cost_ = self.c
+        model.col_lower_ = np.zeros(A.shape[1])
+        model.col_upper_ = np.full(A.shape[1], highspy.kHighsInf)
+        model.row_lower_ = self.b_eq
+        model.row_upper_ = self.b_eq
+        model.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        model.a_matrix_.start_ = A.indptr
+        model.a_matrix_.index_ = A.indices
+        model.a_matrix_.value_ = A.data
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', False)
+        h.setOptionValue('solver', 'simplex')
+        h.passModel(model)
+        return h
+
+
+def split_solution(lp, x):
+    """Split a solution vector of `lp` into labelled inventory and flow Series."""
+    num_stocked = len(lp.stocked_nodes)
+    inventory = pd.Series(x[:num_stocked], index=lp.stocked_nodes, name='Optimized Inventory')
+    flows = lp.edges.assign(Flow=x[num_stocked:])
+    return inventory, flows
+
+
+def _column(df, name, default):
+    if name in df:
+        return df[name].to_numpy(dtype=float)
+    return np.full(len(df), default)
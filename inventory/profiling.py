@@ -0,0 +1,185 @@
+"""Timing spans for page reruns and the calculation core.
+
+A `Profiler` covers one page rerun. The page marks its stages in order
+(`profiler.stage('simulation')` ends the previous stage and starts the next),
+and library code records finer spans with `span()` or `@instrument`, which
+attach to the profiler of the current rerun and cost next to nothing when no
+profiler is active. `Profiler.finish()` logs the rerun as one JSON record on
+the `inventory.profiling` logger and adds its stage timings to process-wide
+metrics (`stage_metrics()`). With `cprofile=True` the whole rerun is also
+captured with cProfile.
+
+A profiler is active from its creation until `finish()` or `close()`; used as
+a context manager it is finished on success and closed on any exception.
+
+The logger writes its records to stderr at INFO level, one JSON object per
+line, and does not propagate to the root logger. Raise its level to WARNING
+to silence it, or replace its handler to ship the records elsewhere.
+"""
+
+import contextlib
+import contextvars
+import cProfile
+import functools
+import io
+import itertools
+import json
+import logging
+import pstats
+import threading
+import time
+
+STAGES = ('inputs', 'calculation', 'simulation', 'solve', 'render')
+
+logger = logging.getLogger('inventory.profiling')
+logger.setLevel(logging.INFO)
+logger.propagate = False
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+
+_current = contextvars.ContextVar('inventory_profiler', default=None)
+_rerun_ids = itertools.count(1)
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+class Profiler:
+    """Stage and span timings of one page rerun."""
+
+    def __init__(self, page, cprofile=False):
+        self.page = page
+        self.rerun = next(_rerun_ids)
+        self.spans = []  # dicts with stage, name, start and seconds (start relative to the rerun)
+        self.stage_name = None
+        self.profile = cProfile.Profile() if cprofile else None
+        self._start = time.perf_counter()
+        self._stage_start = None
+        self._token = _current.set(self)
+        self.closed = False
+        if self.profile is not None:
+            self.profile.enable()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finish()
+        else:
+            self.close()
+
+    def stage(self, name):
+        """End the current stage (if any) and start `name`."""
+        now = time.perf_counter()
+        self._end_stage(now)
+        self.stage_name, self._stage_start = name, now
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Time a block inside the current stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(self.stage_name, name, start, time.perf_counter())
+
+    def stage_totals(self):
+        """Seconds per stage, in first-seen order (stages may be entered more than once)."""
+        totals = {}
+        for span in self.spans:
+            if span['name'] is None:
+                totals[span['stage']] = totals.get(span['stage'], 0.0) + span['seconds']
+        return totals
+
+    def finish(self):
+        """Close the last stage, log the rerun and update the process-wide metrics."""
+        now = time.perf_counter()
+        self._end_stage(now)
+        self.stage_name = None
+        self.close()
+        self.total = now - self._start
+
+        stages = self.stage_totals()
+        with _metrics_lock:
+            for stage, seconds in stages.items():
+                entry = _metrics.setdefault((self.page, stage), {'count': 0, 'total': 0.0, 'max': 0.0})
+                entry['count'] += 1
+                entry['total'] += seconds
+                entry['max'] = max(entry['max'], seconds)
+        logger.info(json.dumps({
+            'event': 'page_rerun',
+            'page': self.page,
+            'rerun': self.rerun,
+            'total_ms': round(self.total * 1000, 3),
+            'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()},
+            'spans': [{**span, 'start': round(span['start'] * 1000, 3), 'seconds': round(span['seconds'] * 1000, 3)}
+                      for span in self.spans if span['name'] is not None],
+        }))
+        return self
+
+    def close(self):
+        """Stop the cProfile capture and deactivate the profiler, without logging.
+
+        Safe to call more than once, and from a later rerun of the same thread.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.profile is not None:
+            self.profile.disable()
+        try:
+            _current.reset(self._token)
+        except ValueError:  # set in another context
+            if _current.get() is self:
+                _current.set(None)
+
+    def profile_report(self, limit=25, sort='cumulative'):
+        """Top `limit` functions of the cProfile capture as text, or None without one."""
+        if self.profile is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def _end_stage(self, now):
+        if self.stage_name is not None:
+            self._record(self.stage_name, None, self._stage_start, now)
+
+    def _record(self, stage, name, start, end):
+        self.spans.append({'stage': stage, 'name': name, 'start': start - self._start, 'seconds': end - start})
+
+
+def current_profiler():
+    return _current.get()
+
+
+def span(name):
+    """Context manager timing `name` under the active profiler; a no-op without one."""
+    profiler = _current.get()
+    return profiler.span(name) if profiler is not None else contextlib.nullcontext()
+
+
+def instrument(func):
+    """Decorator recording every call of `func` as a span named after it."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _current.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.span(func.__qualname__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def stage_metrics():
+    """Process-wide per page and stage rerun count, mean and max seconds."""
+    with _metrics_lock:
+        return {key: {'count': entry['count'], 'mean': entry['total'] / entry['count'], 'max': entry['max']}
+                for key, entry in _metrics.items()}
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
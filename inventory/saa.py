@@ -0,0 +1,173 @@
+"""Sample-average approximation (SAA) of the network LP under uncertain demand and lead times.
+
+The deterministic network LP (`inventory.network`) stocks each demand node for
+one known demand value. Here every demand node `n` instead draws `S`
+scenarios of its demand over the protection interval (a Poisson lead time
+plus one review period), and its stock must reach a target fill rate across
+those scenarios. The block-structured LP adds, per demand node, a base stock
+`y_n` and a shortage `u_ns` per scenario to the network LP::
+
+    x_n - sum(outbound f) - y_n = 0
+    y_n + u_ns >= D_ns                       for every scenario s
+    sum_s u_ns <= (1 - target) * sum_s D_ns
+
+The scenario rows only couple a node with its own base stock, so the problem
+decomposes: each `y_n` is the smallest stock whose expected shortage meets
+the budget, found in closed form from the sorted scenarios. One deterministic
+network solve with demand `y` then gives the same optimum as the block LP.
+The decomposed method stays fast at hundreds of scenarios on large
+networks, where the block LP has `nodes x scenarios` rows.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.network import NetworkSolver, _column, build_network_lp, split_solution
+from inventory.profiling import instrument
+from inventory.streams import item_seeds
+
+pd = lazy_import('pandas')
+sparse = lazy_import('scipy.sparse')
+optimize = lazy_import('scipy.optimize')
+
+REVIEW_PERIOD = 1  # periods added to the lead time in the protection interval
+
+
+@dataclass
+class SAAResult:
+    """Inventory and flows of the SAA solution plus per demand node scenario statistics."""
+
+    inventory: 'pd.Series'
+    flows: 'pd.DataFrame'
+    base_stock: 'pd.DataFrame'  # Base Stock, Mean Scenario Demand, Fill Rate per demand node
+    scenarios: int
+
+
+@instrument
+def sample_lead_time_demand(demand_mean, demand_std, lead_time_mean, scenarios, seed=None):
+    """Draw `(items, scenarios)` protection-interval demand.
+
+    Each scenario draws a Poisson lead time `L` with mean `lead_time_mean`,
+    then normal demand over `L + REVIEW_PERIOD` periods (mean and variance
+    scale with the interval), truncated at zero. Each item uses its own
+    stream of `seed` (see `inventory.streams`).
+    """
+    demand_mean, demand_std, lead_time_mean = (
+        np.atleast_1d(np.asarray(p, dtype=float)) for p in np.broadcast_arrays(demand_mean, demand_std, lead_time_mean))
+    demand = np.empty((demand_mean.size, scenarios))
+    for i, child in enumerate(item_seeds(seed, demand_mean.size)):
+        rng = np.random.default_rng(child)
+        periods = rng.poisson(lead_time_mean[i], scenarios) + REVIEW_PERIOD
+        demand[i] = periods * demand_mean[i] + np.sqrt(periods) * demand_std[i] * rng.standard_normal(scenarios)
+    return np.maximum(demand, 0.0)
+
+
+@instrument
+def fill_rate_base_stock(demand, target_fill_rate):
+    """Smallest stock per row of `demand` (items x scenarios) meeting the fill-rate target.
+
+    The fill rate of stock `y` over the scenarios is
+    `1 - sum_s max(D_s - y, 0) / sum_s D_s`. The shortage is piecewise linear
+    in `y` with breakpoints at the scenario demands, so after sorting each
+    row the answer is read off the segment where it crosses the budget.
+    """
+    demand = np.atleast_2d(np.asarray(demand, dtype=float))
+    budget = (1 - target_fill_rate) * demand.sum(axis=1)
+    ordered = -np.sort(-demand, axis=1)          # descending
+    cumulative = np.cumsum(ordered, axis=1)
+    k = np.arange(1, demand.shape[1] + 1)
+    # Shortage when the stock equals the k-th largest scenario demand
+    shortage_at = cumulative - k * ordered
+    segment = (shortage_at <= budget[:, None]).sum(axis=1)  # scenarios short on the crossing segment
+    total = np.take_along_axis(cumulative, segment[:, None] - 1, axis=1)[:, 0]
+    return np.maximum((total - budget) / segment, 0.0)
+
+
+def achieved_fill_rate(demand, base_stock):
+    """In-sample fill rate of `base_stock` per row of `demand`."""
+    demand = np.atleast_2d(np.asarray(demand, dtype=float))
+    total = demand.sum(axis=1)
+    shortage = np.maximum(demand - np.asarray(base_stock, dtype=float)[:, None], 0).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, 1 - shortage / total, 1.0)
+
+
+@instrument
+def build_saa_lp(nodes, edges, demand_nodes, scenario_demand, target_fill_rate):
+    """Assemble the block-structured SAA LP in `linprog` form.
+
+    Returns `(network_lp, c, A_ub, b_ub, A_eq, b_eq)`. Variables are the
+    network LP's `[x, f]` followed by `y` per demand node and `u` per demand
+    node and scenario (node-major).
+    """
+    lp = build_network_lp(nodes.assign(Demand=0.0), edges)
+    num_demand, num_scenarios = scenario_demand.shape
+    y_vars = lp.num_vars + np.arange(num_demand)
+    u_vars = lp.num_vars + num_demand + np.arange(num_demand * num_scenarios).reshape(num_demand, num_scenarios)
+    num_vars = lp.num_vars + num_demand * (1 + num_scenarios)
+
+    # -y_n in the node's `x_n - outbound = 0` row
+    demand_rows = lp.demand_rows[_stocked_positions(lp, demand_nodes)]
+    A_eq = sparse.hstack([lp.A_eq, sparse.coo_matrix(
+        (-np.ones(num_demand), (demand_rows, np.arange(num_demand))), shape=(lp.A_eq.shape[0], num_demand * (1 + num_scenarios)))])
+
+    # -y_n - u_ns <= -D_ns, then sum_s u_ns <= budget_n
+    shortage_rows = np.arange(num_demand * num_scenarios)
+    budget_rows = num_demand * num_scenarios + np.arange(num_demand)
+    rows = np.concatenate([shortage_rows, shortage_rows, np.repeat(budget_rows, num_scenarios)])
+    cols = np.concatenate([np.repeat(y_vars, num_scenarios), u_vars.ravel(), u_vars.ravel()])
+    data = np.concatenate([-np.ones(2 * shortage_rows.size), np.ones(shortage_rows.size)])
+    A_ub = sparse.coo_matrix((data, (rows, cols)), shape=(num_demand * (num_scenarios + 1), num_vars))
+    b_ub = np.concatenate([-scenario_demand.ravel(), (1 - target_fill_rate) * scenario_demand.sum(axis=1)])
+
+    c = np.concatenate([lp.c, np.zeros(num_vars - lp.num_vars)])
+    return lp, c, A_ub.tocsr(), b_ub, A_eq.tocsr(), lp.b_eq
+
+
+def optimize_network_saa(nodes, edges, scenarios=500, target_fill_rate=0.95, method='decomposed', seed=None):
+    """Solve the network LP for base stocks meeting `target_fill_rate` over sampled scenarios.
+
+    `nodes` columns as for `build_network_lp`, where `Demand` is the mean
+    demand per period, plus optional `St. Dev. Demand` (default 0) and
+    `Avg. Lead Time` (Poisson mean of the node's inbound lead time in
+    periods, default 0). `method` is `'decomposed'` (closed-form base stocks
+    plus one network solve) or `'lp'` (the full block LP).
+    """
+    demand_mean = _column(nodes, 'Demand', 0.0)
+    is_demand = demand_mean > 0
+    demand_nodes = pd.Index(nodes['Node'][is_demand])
+    scenario_demand = sample_lead_time_demand(
+        demand_mean[is_demand], _column(nodes, 'St. Dev. Demand', 0.0)[is_demand],
+        _column(nodes, 'Avg. Lead Time', 0.0)[is_demand], scenarios, seed=seed)
+
+    if method == 'decomposed':
+        base_stock = fill_rate_base_stock(scenario_demand, target_fill_rate)
+        lp = build_network_lp(nodes.assign(Demand=0.0), edges)
+        _stocked_positions(lp, demand_nodes)
+        solver = NetworkSolver(lp)
+        inventory, flows = solver.solve(demand=pd.Series(base_stock, index=demand_nodes))
+    elif method == 'lp':
+        lp, c, A_ub, b_ub, A_eq, b_eq = build_saa_lp(nodes, edges, demand_nodes, scenario_demand, target_fill_rate)
+        res = optimize.linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=(0, None), method='highs')
+        x = res.x if res.success else np.zeros(c.size)
+        inventory, flows = split_solution(lp, x[:lp.num_vars])
+        base_stock = x[lp.num_vars:lp.num_vars + len(demand_nodes)]
+    else:
+        raise ValueError(f"Unknown SAA method {method!r}; use 'decomposed' or 'lp'")
+
+    table = pd.DataFrame({
+        'Base Stock': base_stock,
+        'Mean Scenario Demand': scenario_demand.mean(axis=1),
+        'Fill Rate': achieved_fill_rate(scenario_demand, base_stock),
+    }, index=demand_nodes.rename('Location'))
+    return SAAResult(inventory=inventory, flows=flows, base_stock=table, scenarios=scenarios)
+
+
+def _stocked_positions(lp, demand_nodes):
+    """Positions of `demand_nodes` among the stocked nodes of `lp`."""
+    positions = lp.stocked_nodes.get_indexer(demand_nodes)
+    if (positions < 0).any():
+        raise ValueError("Every demand node must have an inbound edge to be stocked from")
+    return positions
@@ -0,0 +1,206 @@
+"""Monte Carlo simulation of the (s, Q) reorder policy used by the SEIO pages.
+
+The replication axis (and any extra SKU axes produced by broadcasting the
+parameters) is vectorized, so each simulated day is a handful of array
+operations no matter how many sample paths are run.
+
+Random numbers come from per-item streams (`inventory.streams`): an item's
+sample paths depend only on the seed and its position in the batch, not on
+which other items are simulated alongside it.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+from inventory.profiling import instrument
+from inventory.streams import NormalStream, OrderNormals, item_seeds
+from inventory.trajectories import open_output
+
+pd = lazy_import('pandas')
+stats = lazy_import('scipy.stats')
+
+KPI_NAMES = {
+    'average_inventory': 'Average Inventory',
+    'stockout_units': 'Stock-Out Units',
+    'order_count': 'Orders Placed',
+    'fill_rate': 'Fill Rate',
+}
+
+
+@dataclass
+class SimulationResult:
+    """Per-replication KPIs, each shaped `(replications,) + batch_shape`."""
+
+    average_inventory: np.ndarray
+    stockout_units: np.ndarray
+    order_count: np.ndarray
+    fill_rate: np.ndarray
+    inventory_levels: np.ndarray = None  # float32 (days, keep_paths) + batch_shape, possibly memory-mapped
+
+    def summary(self, confidence=0.95):
+        """Mean, standard deviation and confidence interval of every KPI.
+
+        One row per KPI, or per KPI and item when the parameters were arrays.
+        """
+        rows = []
+        for attr, label in KPI_NAMES.items():
+            values = getattr(self, attr)
+            mean, std, half_width = confidence_interval(values, confidence)
+            rows.append(pd.DataFrame({
+                'Metric': label,
+                'Item': np.arange(mean.size),
+                'Mean': mean.ravel(),
+                'Std': std.ravel(),
+                'CI Low': (mean - half_width).ravel(),
+                'CI High': (mean + half_width).ravel(),
+            }))
+        table = pd.concat(rows, ignore_index=True)
+        if self.average_inventory.ndim == 1:
+            table = table.drop(columns='Item').set_index('Metric')
+        return table
+
+
+def confidence_interval(values, confidence=0.95):
+    """Return mean, std and CI half-width of `values` over the replication axis."""
+    values = np.asarray(values, dtype=float)
+    n = values.shape[0]
+    mean = values.mean(axis=0)
+    std = values.std(axis=0, ddof=1) if n > 1 else np.zeros_like(mean)
+    t = stats.t.ppf(0.5 + confidence / 2, df=max(n - 1, 1))
+    return mean, std, t * std / np.sqrt(n)
+
+
+@instrument
+def simulate_sq(demand_mean, demand_std, lead_time, lead_time_std, reorder_point, order_quantity,
+                days, replications=1000, initial_inventory=None, integer_demand=False,
+                keep_paths=0, output=None, seed=None):
+    """Simulate the (s, Q) policy for `replications` sample paths of `days` days.
+
+    Mirrors the SEIO page loop: demand is drawn from a normal distribution and
+    backordered, one order of `order_quantity` may be outstanding at a time and
+    its lead time is `max(1, int(normal(lead_time, lead_time_std)))` days.
+    Inventory starts at `initial_inventory` (default: `order_quantity`). Any
+    parameter may be an array; the result then has one column per element.
+    The daily levels of the first `keep_paths` replications are returned for
+    plotting, as float32 written to `output` (a `.npy` path to memory-map or
+    a `trajectories.TrajectoryStore`; in memory by default).
+
+    `seed` seeds one stream per item of the broadcast batch (in C order);
+    it may also be the `streams.item_seeds` of the batch.
+    """
+    params = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (
+        demand_mean, demand_std, lead_time, lead_time_std, reorder_point, order_quantity,
+        order_quantity if initial_inventory is None else initial_inventory)))
+    demand_mean, demand_std, lead_time, lead_time_std, reorder_point, order_quantity, initial_inventory = params
+    shape = (replications,) + demand_mean.shape
+    # per item and day one demand draw for every replication; lead times are drawn per order
+    seeds = item_seeds(seed, demand_mean.size)
+    demand_draws = NormalStream(seeds, (replications,))
+    lead_time_draws = OrderNormals(seeds, replications)
+    lead_time_paths, lead_time_std_paths = np.broadcast_to(lead_time, shape), np.broadcast_to(lead_time_std, shape)
+
+    inventory = np.broadcast_to(initial_inventory, shape).copy()
+    order_pending = np.zeros(shape, dtype=bool)
+    lead_time_remaining = np.zeros(shape)
+    order_count = np.zeros(shape)
+    stockout_units = np.zeros(shape)
+    inventory_total = np.zeros(shape)
+    demand_total = np.zeros(shape)
+    filled_total = np.zeros(shape)
+    daily_demand = np.empty(shape)
+    keep_paths = min(keep_paths, replications)
+    trajectories = open_output(output, days, (keep_paths,) + demand_mean.shape) if keep_paths else None
+
+    for day in range(days):
+        np.multiply(demand_std, demand_draws.next().reshape(shape), out=daily_demand)
+        daily_demand += demand_mean
+        if integer_demand:
+            np.trunc(daily_demand, out=daily_demand)
+        positive_demand = np.maximum(daily_demand, 0)
+        filled_total += np.minimum(positive_demand, np.maximum(inventory, 0))
+        demand_total += positive_demand
+        inventory -= daily_demand
+
+        lead_time_remaining -= order_pending
+        arrived = order_pending & (lead_time_remaining <= 0)
+        inventory += np.where(arrived, order_quantity, 0)
+        order_pending &= ~arrived
+
+        reorder = (inventory <= reorder_point) & ~order_pending
+        if reorder.any():
+            keys = reorder.reshape(replications, -1)
+            draw = lead_time_draws.draw(keys, order_count.reshape(replications, -1)[keys])
+            new_lead_time = lead_time_paths[reorder] + lead_time_std_paths[reorder] * draw
+            lead_time_remaining[reorder] = np.maximum(1, np.trunc(new_lead_time))
+            order_pending |= reorder
+            order_count += reorder
+
+        stockout_units += np.maximum(-inventory, 0)
+        inventory_total += inventory
+        if keep_paths:
+            trajectories.append(inventory[:keep_paths])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fill_rate = np.where(demand_total > 0, filled_total / demand_total, 1.0)
+    if keep_paths:
+        trajectories.flush()
+
+    return SimulationResult(
+        average_inventory=inventory_total / days,
+        stockout_units=stockout_units,
+        order_count=order_count,
+        fill_rate=fill_rate,
+        inventory_levels=trajectories.data if keep_paths else None,
+    )
+
+
+@instrument
+def simulate_customers(demand_mean, demand_std, reorder_point, order_quantity, lead_time, lead_time_std,
+                       days, initial_inventory=None, output=None, seed=None):
+    """Simulate every customer of the MEIO network at once.
+
+    Parameters are per-customer arrays. Mirrors the MEIO page loop: lost
+    sales (inventory never drops below zero), one outstanding order per
+    customer and lead times of `int(normal(lead_time, lead_time_std))` days.
+    Inventory starts at `initial_inventory` (default: the reorder point).
+    Returns the daily inventory level of each customer as float32, shaped
+    `(days, customers)` and recorded at the start of each day; `output`
+    works as in `simulate_sq`. Each customer draws from its own stream of
+    `seed`.
+    """
+    params = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=float)) for p in (
+        demand_mean, demand_std, reorder_point, order_quantity, lead_time, lead_time_std,
+        reorder_point if initial_inventory is None else initial_inventory)))
+    demand_mean, demand_std, reorder_point, order_quantity, lead_time, lead_time_std, initial_inventory = params
+    seeds = item_seeds(seed, initial_inventory.size)
+    demand_draws = NormalStream(seeds, (1,))
+    lead_time_draws = OrderNormals(seeds)
+    order_count = np.zeros(initial_inventory.shape)
+
+    inventory = initial_inventory.copy()
+    order_pending = np.zeros(inventory.shape, dtype=bool)
+    lead_time_remaining = np.zeros(inventory.shape)
+    trajectories = open_output(output, days, inventory.shape)
+
+    for day in range(days):
+        trajectories.append(inventory)
+
+        lead_time_remaining -= order_pending
+        arrived = order_pending & (lead_time_remaining <= 0)
+        inventory += np.where(arrived, order_quantity, 0)
+        order_pending &= ~arrived
+
+        daily_demand = demand_mean + demand_std * demand_draws.next()[0]
+        np.maximum(inventory - daily_demand, 0, out=inventory)
+
+        reorder = (inventory <= reorder_point) & ~order_pending
+        if reorder.any():
+            draw = lead_time_draws.draw(reorder[None, :], order_count[reorder])
+            lead_time_remaining[reorder] = np.trunc(lead_time[reorder] + lead_time_std[reorder] * draw)
+            order_pending |= reorder
+            order_count += reorder
+
+    trajectories.flush()
+    return trajectories.data
@@ -0,0 +1,148 @@
+"""Reproducible random streams for the simulators and scenario generators.
+
+Every stochastic item (a SKU, a customer, a network node) has an index `i`
+under a root `SeedSequence(seed)`, and its random numbers depend only on the
+seed and that index. An item therefore sees the same numbers whether it is
+simulated alone, in a batch, or in any partition on any worker, as long as
+it keeps its index `i` (see `item_seeds(..., start=)`).
+
+Item `i`'s own seed sequence, `item_seeds(seed, n)[i]`, is the same child
+`SeedSequence(seed).spawn(n)[i]` would give. It suits loops that handle one
+item at a time (the event simulator, SAA scenarios).
+
+The vectorized simulators draw per period for every item, e.g. demand for
+every replication. One `Generator` per item costs about 20 us to create and
+a Python call per period, which dominates at large item counts, so
+`NormalStream` shares generators between items: items are split by index into
+fixed groups of `GROUP_CELLS // draws per period` items, and each group's
+generator fills one period of the whole group after another. An item's draws
+are its slot in its group's periods, so they still depend only on the seed,
+the item index and the draws per period, never on the rest of the batch.
+Groups at the edges of a batch are drawn in full and their unused slots
+discarded.
+
+Draws for sparse events, such as the lead time of an order, would waste a
+stream slot per item and period. `OrderNormals` instead derives the `k`-th
+draw of an item directly from a per-item key and `k` (a SplitMix64 hash), so
+only the items placing an order are drawn.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from inventory._lazy import lazy_import
+
+special = lazy_import('scipy.special')
+
+GROUP_CELLS = 512  # draws per period of one group generator
+_GROUP_DOMAIN = 0x67726F7570  # spawn-key tags separating these streams from item children
+_KEY_DOMAIN = 0x6B6579
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+@dataclass(frozen=True)
+class ItemSeeds:
+    """Seed sequences of items `start .. start + count - 1` of a root seed sequence."""
+
+    root: np.random.SeedSequence
+    start: int
+    count: int
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError(index)
+        return _child(self.root, self.start + index % self.count)
+
+    def __iter__(self):
+        return (_child(self.root, self.start + i) for i in range(self.count))
+
+
+def item_seeds(seed, count, start=0):
+    """Seed sequences for items `start .. start + count - 1` of the root `seed`.
+
+    `seed` is an int, None (fresh entropy), a `SeedSequence`, or already the
+    `ItemSeeds` of `count` items, which is returned unchanged.
+    """
+    if isinstance(seed, ItemSeeds):
+        if len(seed) != count:
+            raise ValueError(f"Expected seeds for {count} items, got {len(seed)}")
+        return seed
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return ItemSeeds(root, start, count)
+
+
+def generators(seed, count):
+    """`count` independent generators for the streams of one root `seed`."""
+    return [np.random.default_rng(child) for child in item_seeds(seed, count)]
+
+
+class NormalStream:
+    """Standard normal draws for many items, handed out one period at a time.
+
+    Each item of `seeds` (an `ItemSeeds`) gets `prod(per_period)` draws per
+    period; `next()` returns them as a `per_period + (items,)` array, a view
+    of the buffer that is only valid until the next call.
+    """
+
+    def __init__(self, seeds, per_period):
+        self.per_period = tuple(per_period)
+        self.group = max(1, GROUP_CELLS // max(1, int(np.prod(self.per_period))))
+        first = seeds.start // self.group
+        last = (seeds.start + seeds.count - 1) // self.group if seeds.count else first - 1
+        self.generators = [np.random.default_rng(_domain_seed(seeds.root, _GROUP_DOMAIN, self.group, g))
+                           for g in range(first, last + 1)]
+        self.items = slice(seeds.start - first * self.group, seeds.start - first * self.group + seeds.count)
+        self.buffer = np.empty((len(self.generators), self.group) + self.per_period)
+        self.draws = self.buffer.reshape((-1,) + self.per_period)[self.items]
+        self.axes = tuple(range(1, len(self.per_period) + 1)) + (0,)  # item axis last
+
+    def next(self):
+        for generator, out in zip(self.generators, self.buffer):
+            generator.standard_normal(out=out)
+        return self.draws.transpose(self.axes)
+
+
+class OrderNormals:
+    """Standard normal draws indexed by item, copy and a per-item counter.
+
+    `copies` independent keys per item of `seeds` (e.g. one per replication)
+    are laid out as a `(copies, items)` array. `draw(where, counters)`
+    returns draw number `counters` of every key selected by the boolean
+    `where`: the inverse normal CDF of a uniform hashed from key and counter.
+    """
+
+    def __init__(self, seeds, copies=1):
+        base = _domain_seed(seeds.root, _KEY_DOMAIN).generate_state(1, np.uint64)
+        index = np.arange(seeds.start, seeds.start + seeds.count, dtype=np.uint64)
+        copy = np.arange(copies, dtype=np.uint64)[:, None]
+        self.keys = _mix(_mix(base ^ _mix(index + np.uint64(_GOLDEN)))[None, :] + copy * np.uint64(_GOLDEN))
+
+    def draw(self, where, counters):
+        step = np.asarray(counters, dtype=np.uint64) + np.uint64(1)
+        return special.ndtri(_uniform(_mix(self.keys[where] + step * np.uint64(_GOLDEN))))
+
+
+def _child(seed, index):
+    return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (index,), pool_size=seed.pool_size)
+
+
+def _domain_seed(seed, *tags):
+    return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + tags, pool_size=seed.pool_size)
+
+
+def _mix(x):
+    """SplitMix64 finalizer of a uint64 array."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _uniform(bits):
+    """Uniform floats in (0, 1) from the top 52 bits."""
+    return ((bits >> np.uint64(12)) + 0.5) * 2.0 ** -52
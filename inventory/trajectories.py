@@ -0,0 +1,98 @@
+"""Compact storage and downsampling of simulated trajectories.
+
+Simulators write one row per simulated day (or sample time) into a
+`TrajectoryStore`: a day-major float32 array, either in memory or in a
+memory-mapped `.npy` file (`path=`), so long runs over many nodes keep only
+the current day in RAM. Simulators return the `data` array; aggregates
+such as `daily_total` are computed from it on demand, streaming memory-mapped
+files in chunks.
+
+`minmax_decimate` reduces a long trajectory to at most `max_points` points
+per column by keeping the minimum and maximum of each bucket of days, so
+stock-outs and order spikes stay visible in plots.
+"""
+
+import os
+
+import numpy as np
+
+CHUNK_CELLS = 1 << 22   # values read per chunk when streaming a stored file
+MAX_PLOT_POINTS = 2000  # default points per plotted line
+
+
+class TrajectoryStore:
+    """Day-major float32 trajectories written one day at a time."""
+
+    def __init__(self, days, columns_shape=(), path=None):
+        shape = (days,) + tuple(columns_shape)
+        self.path = os.fspath(path) if path is not None else None
+        if self.path is None:
+            self.data = np.empty(shape, dtype=np.float32)
+        else:
+            self.data = np.lib.format.open_memmap(self.path, mode='w+', dtype=np.float32, shape=shape)
+        self.days_written = 0
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    def append(self, levels):
+        """Write the next day's levels (shaped like one row of the store)."""
+        self.data[self.days_written] = levels
+        self.days_written += 1
+
+    def flush(self):
+        if self.path is not None:
+            self.data.flush()
+
+
+def open_output(output, days, columns_shape):
+    """Return a `TrajectoryStore` for a simulator's `output=` argument.
+
+    `output` may be None (in-memory store), a path for a new memory-mapped
+    `.npy` file, or an existing store of the right shape.
+    """
+    if isinstance(output, TrajectoryStore):
+        if output.shape != (days,) + tuple(columns_shape):
+            raise ValueError(f"Trajectory store has shape {output.shape}, expected {(days,) + tuple(columns_shape)}")
+        return output
+    return TrajectoryStore(days, columns_shape, path=output)
+
+
+def iter_blocks(values, chunk_cells=CHUNK_CELLS):
+    """Yield `(start_day, block)` slices of a day-major array, about `chunk_cells` values each."""
+    row_cells = max(1, int(np.prod(values.shape[1:])))
+    rows = max(1, chunk_cells // row_cells)
+    for start in range(0, values.shape[0], rows):
+        yield start, values[start:start + rows]
+
+
+def daily_total(values):
+    """Sum over all columns per day of a day-major array, streamed in chunks."""
+    return np.concatenate([block.reshape(len(block), -1).sum(axis=1, dtype=float) for _, block in iter_blocks(values)])
+
+
+def minmax_decimate(values, max_points=MAX_PLOT_POINTS):
+    """Downsample a day-major array to at most `max_points` rows for plotting.
+
+    Days are grouped into equal buckets and each bucket contributes its
+    minimum and maximum (in that order), so the result traces the envelope
+    of the original line. Returns `(x, y)` with `x` the day index of each
+    row. Arrays that are already short enough are returned as they are.
+    Memory-mapped input is read in chunks of whole buckets.
+    """
+    days = values.shape[0]
+    if days <= max_points:
+        return np.arange(days), np.asarray(values)
+    bucket = int(np.ceil(days / (max_points // 2)))
+    row_cells = max(1, int(np.prod(values.shape[1:])))
+    rows = max(bucket, (CHUNK_CELLS // row_cells) // bucket * bucket)
+
+    xs, ys = [], []
+    for start, block in iter_blocks(values, rows * row_cells):
+        block = np.asarray(block, dtype=float)
+        edges = np.arange(0, len(block), bucket)
+        low, high = np.minimum.reduceat(block, edges, axis=0), np.maximum.reduceat(block, edges, axis=0)
+        ys.append(np.stack([low, high], axis=1).reshape((2 * len(edges),) + block.shape[1:]))
+        xs.append(np.repeat(start + edges + (np.minimum(edges + bucket, len(block)) - edges - 1) / 2, 2))
+    return np.concatenate(xs), np.concatenate(ys)
@@ -1,9 +1,12 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.stats as stats
+from inventory import cache
+from inventory.calculations import calculate_reorder_point
+from inventory.charts import page_chart, show_chart
+from inventory.debug_panel import finish_page_profile, start_page_profile
 
 st.set_page_config(page_title="Single Echelon Demo")
+profiler = start_page_profile("SEIO")
 
 st.markdown("# SEIO Fundamentals")
 st.sidebar.header("Single Echelon Demo")
@@ -13,16 +16,6 @@ st.write(
 """
 )
 
-# Function to calculate safety stock
-def calculate_safety_stock(demand_std, lead_time, lead_time_std, service_level):
-    z = stats.norm.ppf(service_level / 100)  # Convert service level percentage to Z-score
-    safety_stock = z * np.sqrt((demand_std ** 2 * lead_time) + (demand_std ** 2 * lead_time_std ** 2))
-    return safety_stock
-
-# Function to calculate reorder point
-def calculate_reorder_point(demand_mean, lead_time, safety_stock):
-    return (demand_mean * lead_time) + safety_stock
-
 # Streamlit UI Setup
 st.title("Inventory Optimization Tool")
 st.sidebar.header("Input Parameters")
@@ -35,69 +28,60 @@ lead_time_std = st.sidebar.number_input("Lead Time Standard Deviation", min_valu
 service_level = st.sidebar.number_input("Service Level (%)", min_value=50.0, max_value=99.99, value=95.0)
 order_quantity = st.sidebar.number_input("Order Quantity", min_value=1, value=35)
 simulation_days = st.sidebar.number_input("Simulation Days", min_value=10, max_value=365, value=20)
+replications = st.sidebar.number_input("Simulation Replications", min_value=1, max_value=10000, value=1000)
+random_seed = st.sidebar.number_input("Random Seed", min_value=0, value=42)
+
+profiler.stage("calculation")
 
 # Compute Safety Stock and Reorder Point
-safety_stock = calculate_safety_stock(demand_std, lead_time, lead_time_std, service_level)
+safety_stock = cache.safety_stock(demand_std, lead_time, lead_time_std, service_level)
 reorder_point = calculate_reorder_point(demand_mean, lead_time, safety_stock)
 
 st.write(f"### Recommended Safety Stock: {round(safety_stock)} units")
 st.write(f"### Reorder Point: {round(reorder_point)} units")
 
+profiler.stage("render")
+
 # Visualization
-fig, axes = plt.subplots(2, 2, figsize=(12, 8), gridspec_kw={'height_ratios': [1, 1.5]})
+chart = page_chart("SEIO", [['demand', 'lead_time'], ['inventory', 'inventory']], figsize=(12, 8),
+                   height_ratios=[1, 1.5])
 
 # Demand Distribution Plot
 x = np.linspace(demand_mean - 3*demand_std, demand_mean + 3*demand_std, 100)
 y = (1 / (demand_std * np.sqrt(2 * np.pi))) * np.exp(-0.5 * ((x - demand_mean) / demand_std) ** 2)
-axes[0, 0].plot(x, y, label="Demand Distribution")
-axes[0, 0].axvline(demand_mean, color='r', linestyle='--', label="Mean Demand")
-axes[0, 0].set_title("Demand Distribution")
-axes[0, 0].legend()
+chart.line('demand', 'density', x, y, label="Demand Distribution")
+chart.vline('demand', 'mean', demand_mean, color='r', linestyle='--', label="Mean Demand")
+chart.axes['demand'].set_title("Demand Distribution")
 
 # Lead Time Distribution Plot
 lead_time_x = np.linspace(lead_time - 3*lead_time_std, lead_time + 3*lead_time_std, 100)
 lead_time_y = (1 / (lead_time_std * np.sqrt(2 * np.pi))) * np.exp(-0.5 * ((lead_time_x - lead_time) / lead_time_std) ** 2)
-axes[0, 1].plot(lead_time_x, lead_time_y, label="Lead Time Distribution", color='orange')
-axes[0, 1].axvline(lead_time, color='r', linestyle='--', label="Mean Lead Time")
-axes[0, 1].set_title("Lead Time Distribution")
-axes[0, 1].legend()
-
-# Inventory Line Plot Simulation with Lead Time
-inventory_levels = []
-current_inventory = order_quantity
-order_pending = False
-lead_time_remaining = 0
-for day in range(simulation_days):
-    daily_demand = np.random.normal(demand_mean, demand_std)
-    current_inventory -= daily_demand
-    
-    if order_pending:
-        lead_time_remaining -= 1
-        if lead_time_remaining <= 0:
-            current_inventory += order_quantity
-            order_pending = False
-    
-    if current_inventory <= reorder_point and not order_pending:
-        order_pending = True
-        lead_time_remaining = max(1, int(np.random.normal(lead_time, lead_time_std)))
-    
-    inventory_levels.append(current_inventory)
+chart.line('lead_time', 'density', lead_time_x, lead_time_y, label="Lead Time Distribution", color='orange')
+chart.vline('lead_time', 'mean', lead_time, color='r', linestyle='--', label="Mean Lead Time")
+chart.axes['lead_time'].set_title("Lead Time Distribution")
+
+profiler.stage("simulation")
+
+# Inventory Simulation with Lead Time, replicated to estimate the KPI distribution
+simulation = cache.simulate_sq(demand_mean, demand_std, lead_time, lead_time_std, reorder_point, order_quantity,
+                               simulation_days, replications=replications, keep_paths=1, seed=random_seed)
 
 # calculate average inventory level
-average_inventory = sum(inventory_levels) / len(inventory_levels)
+average_inventory = simulation.average_inventory.mean()
+
+profiler.stage("render")
 
 # Inventory Bar Chart - Full Bottom Row
-ax_big = fig.add_subplot(2, 1, 2)
-ax_big.plot(range(simulation_days), inventory_levels, label="Inventory Level", color='blue')
-ax_big.axhline(safety_stock, color='green', linestyle='--', label="Safety Stock")
-ax_big.axhline(reorder_point, color='red', linestyle='--', label="Reorder Point")
-ax_big.axhline(average_inventory, color='black', linestyle='--', label="Avg. Inventory")
-ax_big.set_title("Inventory Over Time")
-ax_big.legend()
-
-fig.delaxes(axes[1, 1])  # Remove the empty subplot
-fig.delaxes(axes[1, 0])  
-plt.tight_layout()
-st.pyplot(fig)
-
-st.write("Use the sidebar to adjust parameters and see the impact on safety stock and reorder point.")
\ No newline at end of file
+chart.line('inventory', 'level', None, simulation.inventory_levels[:, 0], label="Inventory Level", color='blue')  # first sample path
+chart.hline('inventory', 'safety_stock', safety_stock, color='green', linestyle='--', label="Safety Stock")
+chart.hline('inventory', 'reorder_point', reorder_point, color='red', linestyle='--', label="Reorder Point")
+chart.hline('inventory', 'average', average_inventory, color='black', linestyle='--', label="Avg. Inventory")
+chart.axes['inventory'].set_title("Inventory Over Time")
+show_chart(chart)
+
+st.write(f"### Simulated KPIs ({replications} replications, 95% CI)")
+st.dataframe(simulation.summary())
+
+st.write("Use the sidebar to adjust parameters and see the impact on safety stock and reorder point.")
+
+finish_page_profile(profiler)
\ No newline at end of file
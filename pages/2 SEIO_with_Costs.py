@@ -1,9 +1,12 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-import scipy.stats as stats
+from inventory import cache
+from inventory.calculations import calculate_eoq, calculate_reorder_point
+from inventory.charts import page_chart, show_chart
+from inventory.costs import calc_inv_cost
+from inventory.debug_panel import finish_page_profile, start_page_profile
 
 st.set_page_config(page_title="Single Echelon with Costs Demo")
+profiler = start_page_profile("SEIO with Costs")
 
 st.markdown("# SEIO Solved with Financials")
 st.sidebar.header("Single Echelon with Costs Demo")
@@ -13,16 +16,6 @@ st.write(
 """
 )
 
-# Function to calculate safety stock
-def calculate_safety_stock(demand_std, lead_time, lead_time_std, service_level):
-    z = stats.norm.ppf(service_level / 100)  # Convert service level percentage to Z-score
-    safety_stock = z * np.sqrt((demand_std ** 2 * lead_time) + (demand_std ** 2 * lead_time_std ** 2))
-    return int(safety_stock)
-
-# Function to calculate reorder point
-def calculate_reorder_point(demand_mean, lead_time, safety_stock):
-    return int((demand_mean * lead_time) + safety_stock)
-
 # Streamlit UI Setup
 st.title("Inventory Optimization Tool")
 st.sidebar.header("Input Parameters")
@@ -38,87 +31,76 @@ order_cost = st.sidebar.number_input("Ordering Cost ($)", min_value=0.01, value=
 order_quantity = st.sidebar.number_input("Order Quantity", min_value=1, value=20)
 stock_out_cost_per_unit = st.sidebar.number_input("Stock-Out Cost per Unit ($)", min_value=0.01, value=100.0)
 simulation_days = st.sidebar.number_input("Simulation Days", min_value=1, max_value=365, value=20)
+replications = st.sidebar.number_input("Simulation Replications", min_value=1, max_value=10000, value=1000)
+random_seed = st.sidebar.number_input("Random Seed", min_value=0, value=42)
+
+profiler.stage("calculation")
 
 # Compute Safety Stock and Reorder Point
-safety_stock = calculate_safety_stock(demand_std, lead_time, lead_time_std, service_level)
-reorder_point = calculate_reorder_point(demand_mean, lead_time, safety_stock)
+safety_stock = int(cache.safety_stock(demand_std, lead_time, lead_time_std, service_level))
+reorder_point = int(calculate_reorder_point(demand_mean, lead_time, safety_stock))
 
 # EOQ Tradeoff Chart
-eoq = (np.sqrt((2 * demand_mean * 365 * order_cost) / holding_cost_per_unit))
-quantity = np.linspace(5, eoq*1.5, 5000)
-holding_cost_eoq = (holding_cost_per_unit * quantity)/2
-ordering_cost_eoq = (order_cost*demand_mean*365) / quantity
-total_cost_eoq = holding_cost_eoq + ordering_cost_eoq
-
-# Inventory Line Plot Simulation with Lead Time
-inventory_levels = []
-current_inventory = order_quantity
-order_pending = False
-order_count = 0
-lead_time_remaining = 0
-stock_out = 0
-for day in range(simulation_days):
-    daily_demand = int(np.random.normal(demand_mean, demand_std))
-    current_inventory -= daily_demand
-    
-    if order_pending:
-        lead_time_remaining -= 1
-        if lead_time_remaining <= 0:
-            current_inventory += order_quantity
-            order_pending = False
-    
-    if current_inventory <= reorder_point and not order_pending:
-        order_pending = True
-        order_count += 1
-        lead_time_remaining = max(1, int(np.random.normal(lead_time, lead_time_std)))
-    
-    if current_inventory < 0:
-        stock_out -= current_inventory
-
-    inventory_levels.append(current_inventory)
-    
+eoq = calculate_eoq(demand_mean, order_cost, holding_cost_per_unit)
+quantity, holding_cost_eoq, ordering_cost_eoq, total_cost_eoq = cache.eoq_cost_curve(demand_mean, order_cost, holding_cost_per_unit)
+
+profiler.stage("simulation")
+
+# Inventory Simulation with Lead Time, replicated to estimate the KPI distribution
+simulation = cache.simulate_sq(demand_mean, demand_std, lead_time, lead_time_std, reorder_point, order_quantity,
+                               simulation_days, replications=replications, integer_demand=True, keep_paths=1,
+                               seed=random_seed)
+
 # calculate average inventory level
-average_inventory = sum(inventory_levels) / len(inventory_levels)
+average_inventory = simulation.average_inventory.mean()
 
-def calc_inv_cost(quantity, holding_cost_per_unit, order_cost, demand_mean, stock_out_cost_per_unit, service_level):
-    holding_cost_ann = (holding_cost_per_unit * quantity)/2
-    ordering_cost_ann = (order_cost*demand_mean*365) / quantity
-    inventory_cost_ann = holding_cost_ann + ordering_cost_ann
-    stock_out_cost_ann = stock_out_cost_per_unit * ((100 - service_level) / 100) * 365 * demand_mean
-    return inventory_cost_ann, stock_out_cost_ann, holding_cost_ann, ordering_cost_ann
+profiler.stage("calculation")
 
 inv_ann, stock_out_ann, holding_ann, ordering_ann = calc_inv_cost(order_quantity, holding_cost_per_unit, order_cost, demand_mean, stock_out_cost_per_unit, service_level)
 
+# Service level x order quantity sweep, including the holding cost of safety stock
+sweep = cache.cost_sweep(demand_mean, demand_std, lead_time, lead_time_std, holding_cost_per_unit, order_cost, stock_out_cost_per_unit)
+
+profiler.stage("render")
+
 st.write(f"### Recommended Safety Stock: {round(safety_stock)} units")
 st.write(f"### Reorder Point: {round(reorder_point)} units")
 st.write(f"### Estimated Annual Inventory Cost: ${round(inv_ann, 2)}")
 st.write(f"### Estimated Annual Stock-Out Cost: ${round(stock_out_ann, 2)}")
 st.write(f"### Economic Order Quantity: {round(eoq, 0)}")
+st.write(f"### Cost-Minimizing Service Level: {sweep.best_service_level[0]:.1f}% at Order Quantity {round(sweep.best_order_quantity[0])} (${round(sweep.best_cost[0], 2)}/year)")
+st.write(f"### Simulated KPIs ({replications} replications, 95% CI)")
+st.dataframe(simulation.summary())
 
 # Visualization
-fig, axes = plt.subplots(3, 1, figsize=(8, 15))
+chart = page_chart("SEIO with Costs", [['inventory'], ['costs'], ['eoq'], ['frontier']], figsize=(8, 20))
 
-axes[0].plot(range(simulation_days), inventory_levels, label="Inventory Level", color='blue')
-axes[0].axhline(safety_stock, color='green', linestyle='--', label="Safety Stock")
-axes[0].axhline(reorder_point, color='red', linestyle='--', label="Reorder Point")
-axes[0].axhline(average_inventory, color='black', linestyle='--', label="Avg. Inventory")
-axes[0].set_title("Inventory Over Time")
-axes[0].legend()
+chart.line('inventory', 'level', None, simulation.inventory_levels[:, 0], label="Inventory Level", color='blue')  # first sample path
+chart.hline('inventory', 'safety_stock', safety_stock, color='green', linestyle='--', label="Safety Stock")
+chart.hline('inventory', 'reorder_point', reorder_point, color='red', linestyle='--', label="Reorder Point")
+chart.hline('inventory', 'average', average_inventory, color='black', linestyle='--', label="Avg. Inventory")
+chart.axes['inventory'].set_title("Inventory Over Time")
 
 # Cost Comparison Bar Chart
-axes[1].barh(["Holding Cost", "Ordering Cost", "Stock-Out Cost"], [holding_ann, ordering_ann, stock_out_ann])
-axes[1].set_title("Annual Cost Comparison")
-axes[1].set_xlabel("Cost ($)")
+chart.barh('costs', 'annual', ["Holding Cost", "Ordering Cost", "Stock-Out Cost"], [holding_ann, ordering_ann, stock_out_ann])
+chart.axes['costs'].set_title("Annual Cost Comparison")
+chart.axes['costs'].set_xlabel("Cost ($)")
 
-axes[2].plot(quantity, holding_cost_eoq, label="Holding Cost", color='blue')
-axes[2].plot(quantity, ordering_cost_eoq, label="Ordering Cost", color='red')
-axes[2].plot(quantity, total_cost_eoq, label="Total Cost", color='black', linestyle='dashed')
-axes[2].axvline(eoq, color='cyan', linestyle='--', label="EOQ")
-axes[2].set_title("EOQ Tradeoff Chart")
-axes[2].legend()
+chart.line('eoq', 'holding', quantity, holding_cost_eoq, label="Holding Cost", color='blue')
+chart.line('eoq', 'ordering', quantity, ordering_cost_eoq, label="Ordering Cost", color='red')
+chart.line('eoq', 'total', quantity, total_cost_eoq, label="Total Cost", color='black', linestyle='dashed')
+chart.vline('eoq', 'eoq', eoq, color='cyan', linestyle='--', label="EOQ")
+chart.axes['eoq'].set_title("EOQ Tradeoff Chart")
 
+chart.line('frontier', 'cost', sweep.service_levels, sweep.frontier_cost[0], label="Lowest Total Cost", color='black')
+chart.vline('frontier', 'best', sweep.best_service_level[0], color='cyan', linestyle='--', label="Cost-Minimizing Service Level")
+chart.vline('frontier', 'selected', service_level, color='red', linestyle=':', label="Selected Service Level")
+chart.axes['frontier'].set_title("Service Level / Cost Frontier")
+chart.axes['frontier'].set_xlabel("Service Level (%)")
+chart.axes['frontier'].set_ylabel("Annual Cost incl. Safety Stock ($)")
 
-plt.tight_layout()
-st.pyplot(fig)
+show_chart(chart)
 
 st.write("Use the sidebar to adjust parameters and see the impact on safety stock, reorder point, and cost calculations.")
+
+finish_page_profile(profiler)
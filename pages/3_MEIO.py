@@ -1,29 +1,40 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.stats as stats
 import pandas as pd
+from inventory import cache
+from inventory.calculations import calculate_reorder_point
+from inventory.charts import page_chart, show_chart
+from inventory.debug_panel import finish_page_profile, start_page_profile
+from inventory.gsm import network_from_echelons, optimize_service_times
+from inventory.ingest import table_columns
+from inventory.trajectories import daily_total
 
-# Function to calculate safety stock incorporating lead time variability
-def calculate_safety_stock(demand_std, lead_time, lead_time_std, service_level):
-    z = stats.norm.ppf(service_level / 100)  # Convert service level percentage to Z-score
-    safety_stock = z * np.sqrt((demand_std ** 2 * lead_time) + (demand_std ** 2 * lead_time_std ** 2))
-    return int(safety_stock)
-
-# Function to calculate reorder point
-def calculate_reorder_point(demand_mean, lead_time, safety_stock):
-    return int((demand_mean * lead_time) + safety_stock)
-
-# Function to calculate EOQ
-def calculate_eoq(demand_mean, order_cost, holding_cost):
-    return int(np.sqrt((2 * demand_mean * 365 * order_cost) / holding_cost))
+profiler = start_page_profile("MEIO")
 
 # Streamlit UI Setup
 st.title("Multi-Echelon Inventory Optimization Tool")
 st.sidebar.header("Input Parameters")
 
 simulation_days = st.sidebar.number_input("Simulation Days", min_value=1, max_value=365, value=20)
-inventory_model = st.sidebar.selectbox("Inventory Model", ["Decentralized", "Centralized"], index=0)
+inventory_model = st.sidebar.selectbox("Inventory Model", ["Decentralized", "Centralized", "Guaranteed Service"], index=0)
+warehouse_lead_time = st.sidebar.number_input("Warehouse Lead Time (days)", min_value=0, value=5)
+random_seed = st.sidebar.number_input("Random Seed", min_value=0, value=42)
+demand_history = st.sidebar.file_uploader("Daily Demand History (Customer, Quantity)", type=["csv", "parquet"])
+history_has_lead_time = st.sidebar.checkbox("History includes a 'Lead Time' column", value=False)
+
+# Per-customer statistics streamed from the uploaded history file, cached by its content
+history_stats = None
+if demand_history is not None:
+    history_columns = table_columns(demand_history)
+    missing = [column for column in ['Customer', 'Quantity'] if column not in history_columns]
+    if history_has_lead_time and 'Lead Time' not in history_columns:
+        st.error("The history has no 'Lead Time' column; lead times come from the network table.")
+        history_has_lead_time = False
+    if missing:
+        st.error(f"The history has no {' or '.join(repr(column) for column in missing)} column; it is ignored.")
+    else:
+        history_stats = cache.demand_statistics(demand_history, keys=('Customer',), quantity='Quantity',
+                                                lead_time='Lead Time' if history_has_lead_time else None)
 
 # Echelon 1 Table
 echelon1_data = {'Warehouse': ['WH1'], 'Holding $/Unit': [1.50]}
@@ -41,6 +52,9 @@ echelon2_data = {
     'Service Level': [95, 97]
 }
 echelon2_df = pd.DataFrame(echelon2_data)
+if history_stats is not None:
+    for column in ['Avg. Demand', 'St. Dev. Demand']:
+        echelon2_df[column] = echelon2_df['Customer'].map(history_stats[column]).fillna(echelon2_df[column])
 st.write("### Echelon 2: Customers")
 st.data_editor(echelon2_df, num_rows='dynamic')
 
@@ -53,93 +67,118 @@ network_data = {
     'St. Dev. Lead Time': [1, 1.5]
 }
 network_df = pd.DataFrame(network_data)
+if history_stats is not None and history_has_lead_time:
+    for column in ['Avg. Lead Time', 'St. Dev. Lead Time']:
+        network_df[column] = network_df['Customer'].map(history_stats[column]).fillna(network_df[column])
 st.write("### Network Configuration")
 st.data_editor(network_df, num_rows='dynamic')
 
-# Compute Safety Stock, Reorder Point, and EOQ
+profiler.stage("calculation")
+
+# Compute Safety Stock, Reorder Point, and EOQ for all customers at once
+customer_network = network_df.drop_duplicates('Customer').set_index('Customer')
+policy_inputs = echelon2_df.join(customer_network[['Order Cost', 'Avg. Lead Time', 'St. Dev. Lead Time']], on='Customer')
+policy = cache.inventory_policy(policy_inputs, truncate=True)
+replenishment_time = policy_inputs['Avg. Lead Time']
+
 if inventory_model == "Decentralized":
-    echelon2_df['Safety Stock'] = echelon2_df.apply(lambda row: calculate_safety_stock(
-        row['St. Dev. Demand'], 
-        network_df.loc[network_df['Customer'] == row['Customer'], 'Avg. Lead Time'].values[0],
-        network_df.loc[network_df['Customer'] == row['Customer'], 'St. Dev. Lead Time'].values[0],
-        row['Service Level']), axis=1)
-else:  # Centralized model with risk pooling
+    echelon2_df['Safety Stock'] = policy['Safety Stock']
+elif inventory_model == "Centralized":  # Centralized model with risk pooling
     pooled_demand_std = np.sqrt((echelon2_df['St. Dev. Demand'] ** 2).sum())
     avg_lead_time = network_df['Avg. Lead Time'].mean()
     std_lead_time = network_df['St. Dev. Lead Time'].mean()
-    pooled_safety_stock = calculate_safety_stock(pooled_demand_std, avg_lead_time, std_lead_time, echelon2_df['Service Level'].mean())
+    pooled_safety_stock = int(cache.safety_stock(pooled_demand_std, avg_lead_time, std_lead_time, echelon2_df['Service Level'].mean()))
     echelon2_df['Safety Stock'] = pooled_safety_stock / len(echelon2_df)
-
-echelon2_df['Reorder Point'] = echelon2_df.apply(lambda row: calculate_reorder_point(
-    row['Avg. Demand'],
-    network_df.loc[network_df['Customer'] == row['Customer'], 'Avg. Lead Time'].values[0],
-    row['Safety Stock']), axis=1)
-
-echelon2_df['EOQ'] = echelon2_df.apply(lambda row: calculate_eoq(
-    row['Avg. Demand'],
-    network_df.loc[network_df['Customer'] == row['Customer'], 'Order Cost'].values[0],
-    row['Holding $/Unit']), axis=1)
+else:  # Guaranteed-service model placing safety stock across warehouses and customers
+    profiler.stage("solve")
+    gsm_nodes, gsm_edges = network_from_echelons(echelon1_df, echelon2_df, network_df, warehouse_lead_time)
+    placement = optimize_service_times(gsm_nodes, gsm_edges).set_index('Node')
+    echelon2_df['Safety Stock'] = placement.loc[echelon2_df['Customer'], 'Safety Stock'].to_numpy().astype(int)
+    # Customers must cover the warehouse's committed service time as well as their own lead time
+    replenishment_time = placement.loc[echelon2_df['Customer'], 'Net Replenishment Time'].to_numpy()
+    st.write("### Guaranteed-Service Safety Stock Placement")
+    st.dataframe(placement)
+    profiler.stage("calculation")
+
+echelon2_df['Reorder Point'] = calculate_reorder_point(
+    policy_inputs['Avg. Demand'], replenishment_time, echelon2_df['Safety Stock']).astype(int)
+echelon2_df['EOQ'] = policy['EOQ']
+
+profiler.stage("render")
 
 st.write("### Calculated Inventory Levels")
 st.dataframe(echelon2_df[['Customer', 'Safety Stock', 'Reorder Point', 'EOQ']])
 
-# Simulation of total inventory over time
-fig, ax = plt.subplots(figsize=(10, 6))
-total_inventory_levels = []
-customer_inventory = {customer: [] for customer in echelon2_df['Customer']}
-customer_current_inventory = echelon2_df.set_index('Customer')['Reorder Point'].to_dict()
-customer_order_quantity = echelon2_df.set_index('Customer')['EOQ'].to_dict()
-order_pending = {customer: False for customer in echelon2_df['Customer']}
-lead_time_remaining = {customer: 0 for customer in echelon2_df['Customer']}
-
-for day in range(simulation_days):
-    total_inventory = 0
-    for customer in customer_inventory.keys():
-        customer_inventory[customer].append(customer_current_inventory[customer])
-        total_inventory += customer_current_inventory[customer]
-        
-        if order_pending[customer]:
-            lead_time_remaining[customer] -= 1
-            if lead_time_remaining[customer] <= 0:
-                customer_current_inventory[customer] += customer_order_quantity[customer]
-                order_pending[customer] = False
-        
-        daily_demand = np.random.normal(
-            echelon2_df.loc[echelon2_df['Customer'] == customer, 'Avg. Demand'].values[0],
-            echelon2_df.loc[echelon2_df['Customer'] == customer, 'St. Dev. Demand'].values[0]
-        )
-        
-        customer_current_inventory[customer] = max(0, customer_current_inventory[customer] - daily_demand)
-        
-        if customer_current_inventory[customer] <= echelon2_df.loc[echelon2_df['Customer'] == customer, 'Reorder Point'].values[0] and not order_pending[customer]:
-            order_pending[customer] = True
-            lead_time_remaining[customer] = int(np.random.normal(
-                network_df.loc[network_df['Customer'] == customer, 'Avg. Lead Time'].values[0],
-                network_df.loc[network_df['Customer'] == customer, 'St. Dev. Lead Time'].values[0]
-            ))
-    
-    total_inventory_levels.append(total_inventory)
-
-for customer, inventory_levels in customer_inventory.items():
-    ax.plot(range(simulation_days), inventory_levels, label=f"{customer} Inventory")
-
-ax.set_title("Inventory Over Time Per Customer")
-ax.set_xlabel("Days")
-ax.set_ylabel("Inventory Level")
-ax.legend()
-st.pyplot(fig)
+profiler.stage("simulation")
+
+# Simulation of total inventory over time, stepping all customers at once into a float32 store.
+# Orders arrive after the same replenishment time the reorder points cover (the GSM net replenishment time)
+customer_inventory = cache.simulate_customers(
+    policy_inputs['Avg. Demand'], policy_inputs['St. Dev. Demand'],
+    echelon2_df['Reorder Point'], echelon2_df['EOQ'],
+    np.asarray(replenishment_time, dtype=float), policy_inputs['St. Dev. Lead Time'],
+    simulation_days, seed=random_seed)
+total_inventory_levels = daily_total(customer_inventory)
+
+profiler.stage("render")
+# One line per customer, or percentile bands across customers for large networks
+chart = page_chart("MEIO customers", [['inventory']], figsize=(10, 6))
+chart.series('inventory', 'customers', None, customer_inventory,
+             labels=[f"{customer} Inventory" for customer in echelon2_df['Customer']])
+chart.axes['inventory'].set_title("Inventory Over Time Per Customer")
+chart.axes['inventory'].set_xlabel("Days")
+chart.axes['inventory'].set_ylabel("Inventory Level")
+show_chart(chart)
 
 # calc avg inventory
-avg_inventory = sum(total_inventory_levels) / len(total_inventory_levels)
+avg_inventory = total_inventory_levels.mean()
 
 # Visualization of total inventory over time
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.plot(range(simulation_days), total_inventory_levels, label="Total Inventory Over Time", marker='o')
-ax.axhline(avg_inventory, color='r', linestyle='--', label=f"Average Inventory: {avg_inventory:.2f}")
-ax.set_title("Total Inventory in System Over Time")
-ax.set_xlabel("Days")
-ax.set_ylabel("Total Inventory")
-ax.legend()
-st.pyplot(fig)
+chart = page_chart("MEIO total", [['total']], figsize=(10, 6))
+chart.line('total', 'level', None, total_inventory_levels, label="Total Inventory Over Time", marker='o')
+chart.hline('total', 'average', avg_inventory, color='r', linestyle='--', label=f"Average Inventory: {avg_inventory:.2f}")
+chart.axes['total'].set_title("Total Inventory in System Over Time")
+chart.axes['total'].set_xlabel("Days")
+chart.axes['total'].set_ylabel("Total Inventory")
+show_chart(chart)
+
+# Event-driven simulation: warehouse stock, multiple outstanding orders, backorders or lost sales
+st.write("### Event-Driven Network Simulation")
+event_horizon = st.number_input("Event Simulation Horizon (days)", min_value=1, value=365)
+event_backorders = st.checkbox("Backorder unmet demand (otherwise lost sales)", value=True)
+
+customer_demand = policy_inputs.set_index('Customer')['Avg. Demand']
+customer_eoq = echelon2_df.set_index('Customer')['EOQ']
+event_customers = pd.DataFrame({
+    'Customer': echelon2_df['Customer'],
+    'Warehouse': echelon2_df['Customer'].map(customer_network['Warehouse']),
+    'Avg. Demand': policy_inputs['Avg. Demand'],
+    'St. Dev. Demand': policy_inputs['St. Dev. Demand'],
+    'Reorder Point': echelon2_df['Reorder Point'],
+    'Order Quantity': echelon2_df['EOQ'],
+    'Avg. Lead Time': policy_inputs['Avg. Lead Time'],
+    'St. Dev. Lead Time': policy_inputs['St. Dev. Lead Time'],
+})
+# Each warehouse covers its customers' demand over its own lead time and orders their combined EOQ
+served = network_df.drop_duplicates('Customer').groupby('Warehouse')['Customer'].agg(list)
+warehouse_demand = echelon1_df['Warehouse'].map(lambda w: customer_demand.reindex(served.get(w, [])).sum())
+warehouse_safety_stock = 0.0
+if inventory_model == "Guaranteed Service":
+    warehouse_safety_stock = placement.loc[echelon1_df['Warehouse'], 'Safety Stock'].to_numpy()
+event_warehouses = pd.DataFrame({
+    'Warehouse': echelon1_df['Warehouse'],
+    'Reorder Point': warehouse_demand * warehouse_lead_time + warehouse_safety_stock,
+    'Order Quantity': echelon1_df['Warehouse'].map(lambda w: customer_eoq.reindex(served.get(w, [])).sum()),
+    'Avg. Lead Time': warehouse_lead_time,
+    'St. Dev. Lead Time': 0.0,
+})
+profiler.stage("simulation")
+event_result = cache.simulate_network_events(event_customers, event_warehouses, horizon=event_horizon,
+                                             backorders=event_backorders, seed=random_seed)
+profiler.stage("render")
+st.dataframe(event_result.nodes)
+st.write(f"Processed {event_result.event_count:,} events.")
 
 st.write("Use the sidebar to switch between centralized and decentralized models and see the impact on inventory allocation and risk pooling.")
+
+finish_page_profile(profiler)
@@ -1,11 +1,14 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import scipy.stats as stats
-from scipy.optimize import linprog
+from inventory import cache
+from inventory.charts import page_chart, show_chart
+from inventory.debug_panel import finish_page_profile, start_page_profile
+from inventory.network import network_from_tiers
+from inventory.streams import item_seeds
 
 st.set_page_config(page_title="Advanced Techniques")
+profiler = start_page_profile("Advanced")
 
 st.markdown("# Advanced Techniques in Inventory Optimization")
 st.sidebar.header("Advanced Techniques Demo")
@@ -18,6 +21,13 @@ st.write(
 # User Inputs for Lead Time Distribution
 poisson_lambda = st.sidebar.number_input("Poisson Lambda for Lead Time", min_value=1, max_value=10, value=3)
 simulation_periods = st.sidebar.number_input("Simulation Periods", min_value=5, max_value=50, value=20)
+random_seed = st.sidebar.number_input("Random Seed", min_value=0, value=42)
+demand_model = st.sidebar.selectbox("Demand Model", ["Deterministic (last period)", "Sample Average Approximation"], index=0)
+saa_scenarios = st.sidebar.number_input("Scenarios", min_value=10, max_value=5000, value=500)
+target_fill_rate = st.sidebar.slider("Target Fill Rate (%)", min_value=50.0, max_value=99.9, value=95.0)
+# Independent streams, so changing one consumer never shifts the others' draws
+lead_time_seed, demand_seed, saa_seed = item_seeds(random_seed, 3)
+lead_time_rng, demand_rng = np.random.default_rng(lead_time_seed), np.random.default_rng(demand_seed)
 
 # Define Supply Chain Structure
 suppliers = ["S1"]
@@ -31,65 +41,77 @@ cost_matrix = {
     "D2": {"R4": 2, "R5": 3, "R6": 4},
 }
 
-# Generate Lead Times (Poisson-distributed)
-lead_times = {
-    "S1": {"D1": np.random.poisson(poisson_lambda), "D2": np.random.poisson(poisson_lambda)},
-    "D1": {"R1": np.random.poisson(poisson_lambda), "R2": np.random.poisson(poisson_lambda), "R3": np.random.poisson(poisson_lambda)},
-    "D2": {"R4": np.random.poisson(poisson_lambda), "R5": np.random.poisson(poisson_lambda), "R6": np.random.poisson(poisson_lambda)},
-}
+profiler.stage("simulation")
+
+# Generate Lead Times (Poisson-distributed), one draw per lane in a single call
+lanes = [(source, target) for source, targets in cost_matrix.items() for target in targets]
+lead_times = {source: {} for source in cost_matrix}
+for (source, target), days in zip(lanes, lead_time_rng.poisson(poisson_lambda, size=len(lanes))):
+    lead_times[source][target] = int(days)
 
 # Generate Demand Time Series (Linear Trend)
 time_periods = np.arange(1, simulation_periods + 1)
-demand_trend = 50 + 2 * time_periods + np.random.normal(0, 5, simulation_periods)
-
-# Define Linear Programming Model
-num_vars = len(distributors) + len(retailers)  # Inventory decision variables (for distributors and retailers)
-c = np.ones(num_vars)  # Objective: Minimize total inventory
-
-# Constraints: Demand fulfillment at retailers and flow balance at distributors
-A_eq = []
-b_eq = []
-
-# Demand fulfillment constraints
-for i, retailer in enumerate(retailers):
-    row = [0] * num_vars
-    row[i + len(distributors)] = 1  # Retail inventory variable
-    A_eq.append(row)
-    b_eq.append(demand_trend[-1])  # Last period's demand
-
-# Flow balance constraints at distributors
-for i, distributor in enumerate(distributors):
-    row = [0] * num_vars
-    row[i] = -1  # Distributor inventory variable
-    for j, retailer in enumerate(retailers):
-        if retailer in cost_matrix[distributor]:
-            row[j + len(distributors)] = 1  # Retail inventory variables
-    A_eq.append(row)
-    b_eq.append(0)  # Flow balance
-
-# Solve Linear Program
-res = linprog(c, A_eq=A_eq, b_eq=b_eq, bounds=[(0, None)] * num_vars, method='highs')
-
-# Extract Optimized Inventory Levels
-optimized_inventory = res.x if res.success else np.zeros(num_vars)
-
-distributor_inventory = optimized_inventory[: len(distributors)]
-retailer_inventory = optimized_inventory[len(distributors) :]
+demand_trend = 50 + 2 * time_periods + demand_rng.normal(0, 5, simulation_periods)
+
+profiler.stage("calculation")
+
+# Forecast the coming periods with a Holt (level + trend) exponential smoothing model
+forecast_periods = 5
+demand_forecast = cache.forecast_demand(demand_trend[None, :], horizon=forecast_periods)
+
+profiler.stage("solve")
+
+# Define Linear Programming Model: minimize inventory plus shipping cost while
+# retailers cover next period's forecast demand and distributors cover their retailers
+nodes, edges = network_from_tiers([suppliers, distributors, retailers], cost_matrix)
+nodes['Demand'] = np.where(nodes['Node'].isin(retailers), demand_forecast.mean[0, 0], 0)
+
+# Rolling re-optimization: re-solve the same network for every period's demand
+period_demand = pd.DataFrame(np.repeat(demand_trend[:, None], len(retailers), axis=1), index=time_periods, columns=retailers)
+
+# Solve Linear Program and Extract Optimized Inventory Levels. The solver session
+# outlives reruns, so a new demand warm-starts from the previous solution
+solver = cache.network_solver(nodes.drop(columns='Demand'), edges)
+optimized_inventory, optimized_flows = solver.solve(demand=nodes.set_index('Node')['Demand'])
+rolling_inventory = solver.solve_scenarios(period_demand).rename_axis(index="Period")
+
+if demand_model == "Sample Average Approximation":
+    # Scenarios of demand over a Poisson lead time, with the forecast's one-step error as demand noise
+    saa_nodes = nodes.assign(**{'St. Dev. Demand': np.where(nodes['Demand'] > 0, demand_forecast.std[0, 0], 0.0),
+                                'Avg. Lead Time': poisson_lambda})
+    saa_result = cache.optimize_network_saa(saa_nodes, edges, scenarios=saa_scenarios,
+                                            target_fill_rate=target_fill_rate / 100,
+                                            seed=saa_seed)
+    optimized_inventory, optimized_flows = saa_result.inventory, saa_result.flows
+
+profiler.stage("render")
 
 # Visualization
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.plot(time_periods, demand_trend, label="Demand Trend", linestyle="--", marker="o")
-ax.set_title("Retail Demand Over Time")
-ax.set_xlabel("Time Periods")
-ax.set_ylabel("Demand")
-ax.legend()
-st.pyplot(fig)
+chart = page_chart("Advanced", [['demand']], figsize=(10, 6))
+chart.line('demand', 'history', time_periods, demand_trend, label="Demand Trend", linestyle="--", marker="o")
+forecast_index = simulation_periods + np.arange(1, forecast_periods + 1)
+chart.line('demand', 'forecast', forecast_index, demand_forecast.mean[0], label="Forecast", marker="o")
+chart.band('demand', 'interval', forecast_index, demand_forecast.mean[0] - 1.96 * demand_forecast.std[0],
+           demand_forecast.mean[0] + 1.96 * demand_forecast.std[0], alpha=0.2, label="95% Forecast Interval")
+chart.axes['demand'].set_title("Retail Demand Over Time")
+chart.axes['demand'].set_xlabel("Time Periods")
+chart.axes['demand'].set_ylabel("Demand")
+show_chart(chart)
 
 st.write("### Optimized Inventory Levels")
-df_inventory = pd.DataFrame({
-    "Location": distributors + retailers,
-    "Optimized Inventory": optimized_inventory,
-})
+df_inventory = optimized_inventory.rename_axis("Location").reset_index()
 st.dataframe(df_inventory)
 
+st.write("### Optimized Shipments")
+st.dataframe(optimized_flows)
+
+if demand_model == "Sample Average Approximation":
+    st.write(f"### Retailer Base Stock over {saa_result.scenarios} Scenarios")
+    st.dataframe(saa_result.base_stock)
+
+st.write("### Rolling Re-Optimization by Period")
+st.dataframe(rolling_inventory[distributors].assign(Total=rolling_inventory.sum(axis=1)))
+
 st.write("This model minimizes total inventory while ensuring demand fulfillment across a multi-echelon supply chain.")
+
+finish_page_profile(profiler)